@@ -7,6 +7,10 @@ import pygame as pg
 from config.game_settings import GAME_TITLE, SCREEN_WIDTH, SCREEN_HEIGHT, FPS
 from config.colors import GREEN
 from states.state_manager import StateManager
+from utils.asset_loader import ASSET_LOADER
+from utils.surface_cache import SURFACES
+from utils.display import DISPLAY
+from gui.skins import SKINS
 
 class GameManager:
     """
@@ -25,8 +29,10 @@ class GameManager:
         pg.mixer.init()
         self.screen = pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pg.RESIZABLE)
         pg.display.set_caption(GAME_TITLE)
+        DISPLAY.update()
+        SURFACES.convert_all() # Images loaded before the display existed
         self.clock = pg.time.Clock()
-        self.font = pg.font.Font(None, 36) # FOR FPS DISPLAY ONLY
+        self.font = SKINS.get_font() # FOR FPS DISPLAY ONLY
         self.draw_fps = True # FOR FPS DISPLAY ONLY
         pg.key.set_repeat(250,100) # Call multiple KEYDOWN events when held
         # GAME INIT
@@ -47,6 +53,8 @@ class GameManager:
 
     def update(self):
         """Update current state based on inputs."""
+        # Finish loads whose worker threads are done
+        ASSET_LOADER.update()
         self.state_manager.update()
 
     def draw(self):
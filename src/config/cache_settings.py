@@ -0,0 +1,30 @@
+"""
+Configuration file for asset cache settings.
+
+This file contains the limits used by the in-memory asset caches. Budgets are
+given in bytes of decoded pixel data.
+"""
+# Surface Cache Settings
+SURFACE_CACHE_BUDGET = 32 * 1024 * 1024 # Unused sprite sheets kept in memory
+
+# Sprite Atlas Settings
+SPRITE_ATLAS_PAGE_SIZE = 1024 # Width and height of the surfaces animation frames are packed into
+
+# Text Cache Settings
+TEXT_CACHE_SIZE = 256 # Rendered strings kept for menus and GUI
+TEXT_WORD_CACHE_SIZE = 512 # Rendered words kept for message box dialogue
+
+# Map Chunk Settings
+CHUNK_SIZE = 16 # Width and height of a map chunk in tiles
+CHUNK_CACHE_SIZE = 24 # Rendered chunks kept per map
+ANIMATED_CHUNK_BUDGET = 16 * 1024 * 1024 # Pre-baked animated chunk frames per map
+ANIMATED_CHUNK_MAX_CYCLE = 600 # Longest animation cycle, in updates, that chunks pre-bake
+
+# Map Cache Settings
+MAP_CACHE_BUDGET = 64 * 1024 * 1024 # Recently visited maps kept in memory
+
+# Asset Loader Settings
+ASSET_LOADER_WORKERS = 2 # Threads decoding and parsing assets in the background
+
+# Map Prefetch Settings
+PORTAL_PREFETCH_DISTANCE = 3 # Tiles from a portal at which its map starts loading
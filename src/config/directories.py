@@ -15,6 +15,7 @@ SOURCE_DIR = GAME_DIR / "src"
 ASSET_DIR = GAME_DIR / "assets"
 DATA_DIR = GAME_DIR / "data"
 CONFIG_DIR = SOURCE_DIR / "config"
+ASSET_PACK = GAME_DIR / "assets.pak" # Built by running `python -m utils.asset_store`
 
 # ASSET DIRS
 SPRITES_DIR = ASSET_DIR / "sprites"
@@ -27,5 +28,8 @@ GUI_DIR = ASSET_DIR / "gui"
 USER_HOME_DIR = Path().home() # On windows C:/Users/user
 USER_DOCS_DIR = USER_HOME_DIR / "Documents"
 USER_GAME_DIR = USER_DOCS_DIR / GAME_TITLE
+USER_CACHE_DIR = USER_GAME_DIR / "cache"
+SPRITE_CACHE_DIR = USER_CACHE_DIR / "sprites"
 
 USER_GAME_DIR.mkdir(parents=True, exist_ok=True)
+SPRITE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
@@ -13,3 +13,8 @@ FPS = 60
 TILESIZE = 32
 GRIDWIDTH = SCREEN_WIDTH / TILESIZE
 GRIDHEIGHT = SCREEN_HEIGHT / TILESIZE
+SPATIAL_CELL_SIZE = 4 * TILESIZE # Cell size of the map's spatial indexes
+
+# pathfinding settings
+PATHFINDING_BUDGET_MS = 2 # Time per frame spent planning NPC paths
+PATH_CACHE_SIZE = 256 # Planned paths kept per map
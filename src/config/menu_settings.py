@@ -11,3 +11,7 @@ SIDE_MENU_W = 7*TILESIZE
 SIDE_MENU_H = 18*TILESIZE
 SIDE_MENU_X = SCREEN_WIDTH - SIDE_MENU_W
 SIDE_MENU_Y = ((SCREEN_HEIGHT/TILESIZE - 18)/2)*TILESIZE
+
+# GUI Skin Settings
+PANEL_SLICE_BORDER = 16 # Pixels of a panel's edges kept unscaled by nine-slice scaling
+DEFAULT_FONT_SIZE = 36
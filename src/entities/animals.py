@@ -1,6 +1,12 @@
+import random
 from entities.characters import Character
 from gui.message_box import MessageBox
 from states.sub_message import MessageBoxSubState
+from config.game_settings import FPS
+
+WANDER_RADIUS = 4 # Max tiles from its current tile an animal wanders to
+WANDER_DELAY = (2, 6) # Seconds an animal rests between walks
+WANDER_RETRY_DELAY = 0.5 # Seconds before trying another tile after an unreachable one
 
 
 class Animal(Character):
@@ -8,6 +14,31 @@ class Animal(Character):
         data = self.get_animal_data(animal)
         super().__init__(data)
         self.animal = animal
+        self.rest_timer = random.uniform(*WANDER_DELAY) * FPS
+        self.failed_walks = 0 # Unreachable goals picked in a row
+
+    def think(self, tile_map):
+        """Wander to a random nearby tile every few seconds."""
+        if self.path:
+            self.failed_walks = 0
+        if not self.path and self.path_request is None and self.hitbox.rect == self.destination:
+            self.rest_timer -= 1
+            if self.rest_timer <= 0:
+                self.rest_timer = random.uniform(*WANDER_DELAY) * FPS
+                col, row = tile_map.get_tile_at(self.destination.x, self.destination.y)
+                goal = (
+                    col + random.randint(-WANDER_RADIUS, WANDER_RADIUS),
+                    row + random.randint(-WANDER_RADIUS, WANDER_RADIUS)
+                )
+                if not tile_map.occupancy.is_blocked(*goal):
+                    self.walk_to(goal, tile_map)
+        super().think(tile_map)
+
+    def on_path_failed(self, _request):
+        """Pick another tile soon, backing off while goal after goal is unreachable."""
+        self.failed_walks += 1
+        delay = min(WANDER_RETRY_DELAY * 2 ** (self.failed_walks - 1), WANDER_DELAY[1])
+        self.rest_timer = delay * FPS
 
     def get_animal_data(self, animal):
         return {
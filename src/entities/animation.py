@@ -4,16 +4,127 @@ Module for handling animations from sprite sheets.
 This module contains the `Animation` class, which is designed to represent and manage animations
 from sprite sheets. It provides functionality to load animation frames, update the current frame,
 and retrieve the current animation frame.
+
+Frame data is immutable and shared. An `AnimationSet` holds every animation for one
+combination of sprite sheets and is interned, so entities that look the same share the
+same frames. Each entity only keeps an `AnimationPlayhead` with its own playback state.
+
+Frames are packed into the shared `ATLAS`, sprite sheets are only read while a set is
+created.
 """
 
 from pathlib import Path
+import weakref
 import pygame as pg
-from utils.asset_management import get_anim_data
+from utils.asset_management import get_sheet_data
+from utils.surface_cache import SURFACES
+from utils.sprite_atlas import ATLAS
+from utils.sprite_baking import get_baked_sheet, get_frame_rect
+
+class AnimationSet:
+    """All animations for one combination of sprite sheet layers.
+
+    Sets are interned by their layers, use `AnimationSet.get` rather than creating
+    them directly. A set is kept alive by the entities using it and dropped once
+    none of them are left.
+
+    Attributes:
+        layers (tuple[Path]): The sprite sheets combined to create the animations.
+        animations (dict): Animation objects keyed by animation name.
+    """
+    _interned = weakref.WeakValueDictionary()
+
+    def __init__(self, layers: tuple[Path], owner = None) -> None:
+        self.layers = layers
+        self.sheets = self.get_sheets()
+        self.animations = {}
+        for anim in get_sheet_data(self.sheets[0]).anim_names:
+            self.animations[anim] = Animation(
+                sprite_sheets=list(self.sheets),
+                animation=anim,
+                owner=owner
+            )
+
+    def get_sheets(self) -> tuple[Path]:
+        """The sprite sheets frames are loaded from.
+
+        Layered sets load a single pre-composited sheet from the sprite cache
+        and only fall back to compositing each frame at runtime if it can't be baked.
+        """
+        if len(self.layers) > 1:
+            baked_sheet = get_baked_sheet(self.layers)
+            if baked_sheet is not None:
+                return (baked_sheet,)
+        return self.layers
+
+    @classmethod
+    def get(cls, sprite_sheets: list[Path], owner = None):
+        """Retrieve the shared set for a list of sprite sheets, creating it if needed.
+
+        Args:
+            sprite_sheets (list[Path]): The sprite sheets to combine, bottom layer first.
+            owner (optional): The object the set is used by. Registered with the
+                atlas pages holding the set's frames.
+
+        Returns:
+            AnimationSet: The interned set.
+        """
+        if isinstance(sprite_sheets, Path):
+            sprite_sheets = [sprite_sheets]
+        layers = tuple(path.with_suffix(".png") for path in sprite_sheets)
+        anim_set = cls._interned.get(layers)
+        if anim_set is None:
+            anim_set = cls(layers, owner)
+            cls._interned[layers] = anim_set
+        elif owner is not None:
+            ATLAS.acquire(anim_set.get_frames(), owner)
+        return anim_set
+
+    def get_frames(self) -> set[pg.Surface]:
+        """Every distinct frame of the set's animations."""
+        return {frame for anim in self.animations.values() for frame in anim.frames}
+
+    @property
+    def anim_names(self) -> list[str]:
+        """Names of the animations in the set."""
+        return list(self.animations)
+
+class AnimationPlayhead:
+    """Per-entity playback state for the animations in an AnimationSet."""
+    __slots__ = ("frame", "timer")
+
+    def __init__(self) -> None:
+        self.frame = 0
+        self.timer = 0
+
+    def update(self, animation):
+        """
+        Update the animation frame based on the frame duration.
+        """
+        self.timer += 1
+        if self.timer >= animation.duration:
+            self.timer = 0
+            self.frame = (self.frame + 1) % len(animation.frames)
+
+    def get_current_frame(self, animation) -> pg.Surface:
+        """
+        Get the current frame of an animation.
+
+        Returns:
+            pygame.Surface: The current frame as a pygame Surface.
+        """
+        return animation.frames[self.frame % len(animation.frames)]
 
 class Animation:
+    """The frames of a single animation.
+
+    Animations hold no playback state and may be shared between entities,
+    see `AnimationPlayhead`.
+    """
     def __init__(self,
                  sprite_sheets : list[Path],
-                 animation : str
+                 animation : str,
+                 owner = None
                  ):
         """
         Initialize an Animation object.
@@ -22,6 +133,8 @@ class Animation:
             sprite_sheets (str or list[str]): The name of the sprite sheet(s) containing 
                 the animation frames.
             animation (str): The name of the animation to load from the sprite sheet.
+            owner (optional): The object the animation is loaded for. Used by
+                the atlas to know when its frames are no longer in use.
         """
         if isinstance(sprite_sheets, Path):
             sprite_sheets = [sprite_sheets]  # Convert a single string to a list of one string
@@ -29,10 +142,11 @@ class Animation:
         self.sprite_sheets = sprite_sheets
         self.name = animation
         self.layers = self.create_layers()
-        self.frames = self.create_frames()
+        self.frames = self.create_frames(owner)
         self.duration = self.get_duration()
-        self.current_frame = 0
-        self.frame_timer = 0
+        # The frames are in the atlas now, the sheets don't need to be kept
+        for layer in self.layers:
+            layer.release_sheet()
 
     def create_layers(self):
         """
@@ -47,59 +161,49 @@ class Animation:
             layers.append(layer)
         return layers
 
-    def create_frames(self):
+    def create_frames(self, owner = None):
         """
-        Load animation frames from the sprite sheet.
+        Load animation frames from the sprite sheet into the atlas.
+
+        Layered frames are composited straight into their place in the atlas.
+        Frames already in the atlas, such as ones shared by several animations,
+        are reused.
 
         Returns:
-            list: A list of pygame Surfaces, each representing a frame of the animation.
+            tuple: pygame Surfaces, each representing a frame of the animation.
         """
         # Variables to check for errors
         n_frames = len(self.layers[0].frames)
-        height = self.layers[0].anim_data["frame_h"]
-        width = self.layers[0].anim_data["frame_w"]
+        height = self.layers[0].anim_data.frame_h
+        width = self.layers[0].anim_data.frame_w
         # Make sure layers are compatible
         if not all(len(l.frames) == n_frames for l in self.layers):
             raise ValueError("Not all layers have the same number of frames")
-        if not all(l.anim_data["frame_h"] == height for l in self.layers):
+        if not all(l.anim_data.frame_h == height for l in self.layers):
             raise ValueError("Not all layers have the same height")
-        if not all(l.anim_data["frame_w"] == width for l in self.layers):
+        if not all(l.anim_data.frame_w == width for l in self.layers):
             raise ValueError("Not all layers have the same width")
         # Create combined images
+        sheets = tuple(self.sprite_sheets)
         frames = []
-        n_layers = len(self.layers)
         for i in range(n_frames):
-            frame = self.layers[0].frames[i].copy()
-            for j in range(1,n_layers):
-                frame.blit(self.layers[j].frames[i],(0,0))
+            key = (sheets, tuple(tuple(get_frame_rect(l.anim_data, i)) for l in self.layers))
+            frame, is_new = ATLAS.get_frame(key, (width, height), owner)
+            if is_new:
+                # Frames start cleared, so taking the maximum copies the bottom layer as is
+                frame.blit(self.layers[0].frames[i], (0, 0), special_flags=pg.BLEND_RGBA_MAX)
+                for layer in self.layers[1:]:
+                    frame.blit(layer.frames[i], (0, 0))
             frames.append(frame)
-        return frames
+        return tuple(frames)
 
     def get_duration(self):
         """Get the duration each frame is shown on screen."""
-        duration = self.layers[0].anim_data["duration"]
-        if not all(l.anim_data["duration"] == duration for l in self.layers):
+        duration = self.layers[0].anim_data.duration
+        if not all(l.anim_data.duration == duration for l in self.layers):
             raise ValueError("Not all layers have the same duration")
         return duration
 
-    def update(self):
-        """
-        Update the animation frame based on the frame duration.
-        """
-        self.frame_timer += 1
-        if self.frame_timer >= self.duration:
-            self.frame_timer = 0
-            self.current_frame = (self.current_frame + 1) % len(self.frames)
-
-    def get_current_frame(self):
-        """
-        Get the current frame of the animation.
-
-        Returns:
-            pygame.Surface: The current frame as a pygame Surface.
-        """
-        return self.frames[self.current_frame]
-
 class AnimationLayer:
     """A single component to be combined to create an animation.
     
@@ -117,8 +221,9 @@ class AnimationLayer:
             sprite_sheet (str): The name of the sprite sheet containing the animation frames.
             animation (str): The name of the animation to load from the sprite sheet.
         """
-        self.sprite_sheet = pg.image.load(sprite_sheet)
-        self.anim_data = get_anim_data(sprite_sheet, animation)
+        # The atlas keeps the frames, the sheet may be evicted once they are packed
+        self.sprite_sheet = SURFACES.load(sprite_sheet)
+        self.anim_data = get_sheet_data(sprite_sheet).animations[animation]
         self.frames = self.load_frames()
 
     def load_frames(self):
@@ -129,13 +234,18 @@ class AnimationLayer:
             list: A list of pygame Surfaces, each representing a frame of the animation.
         """
         frames = []
-        for x in self.anim_data["seq"]:
+        for x in self.anim_data.seq:
             frame_rect = pg.Rect(
-                x * self.anim_data["frame_w"],
-                self.anim_data["row"] * self.anim_data["frame_h"],
-                self.anim_data["frame_w"],
-                self.anim_data["frame_h"]
+                x * self.anim_data.frame_w,
+                self.anim_data.row * self.anim_data.frame_h,
+                self.anim_data.frame_w,
+                self.anim_data.frame_h
             )
             frame = self.sprite_sheet.subsurface(frame_rect)
             frames.append(frame)
         return frames
+
+    def release_sheet(self):
+        """Drop the layer's references to its sprite sheet."""
+        self.sprite_sheet = None
+        self.frames = []
@@ -11,6 +11,7 @@ Classes:
     - CharacterAppearance: Manages appearance and animations of a character entity.
 """
 
+from pathlib import Path
 import pygame as pg
 from entities.entity import Entity
 from config.player_settings import WALK_SPEED
@@ -36,17 +37,81 @@ class Character(Entity):
         self.update_appearance()
         self.speed = WALK_SPEED
         self.destination = self.hitbox.rect.copy()
+        self.path = [] # Tiles left to walk through, see walk_to
+        self.path_request = None
 
-    def change_destination(self, x, y, obstacles):
-        """Change the character's target destination."""
+    def change_destination(self, x, y, tile_map = None):
+        """Change the character's target destination.
+
+        Args:
+            x (int): Distance to move horizontally.
+            y (int): Distance to move vertically.
+            tile_map (TiledMap, optional): Map to check for collisions. If None,
+                the character moves without checking for collisions.
+
+        Returns:
+            The object the character collided with, or None.
+        """
         if self.hitbox.rect == self.destination:
             self.destination.x += x
             self.destination.y += y
-        if (idx := self.destination.collidelist(obstacles)) != -1:
-            self.destination = self.hitbox.rect.copy()
-            return obstacles[idx]
+        if tile_map is not None:
+            if (hit := tile_map.collide(self.destination, ignore=self)) is not None:
+                self.destination = self.hitbox.rect.copy()
+                return hit
         return None
 
+    def walk_to(self, tile, tile_map):
+        """Ask the map's pathfinding service for a route to a tile.
+
+        The character starts walking once the path is ready, see `follow_path`.
+
+        Args:
+            tile (tuple[int, int]): The (col, row) to walk to.
+            tile_map (TiledMap): The map the character is on.
+        """
+        start = tile_map.get_tile_at(self.destination.x, self.destination.y)
+        self.path_request = tile_map.pathfinding.request_path(start, tile)
+        self.path = []
+
+    def follow_path(self, tile_map):
+        """Step towards the next tile of the character's path.
+
+        If the way is blocked, e.g. by another character, the rest of the path
+        is dropped so a new one can be requested.
+        """
+        if self.path_request is not None and self.path_request.done:
+            request = self.path_request
+            self.path = list(request.path or [])
+            self.path_request = None
+            if request.has_failed():
+                self.on_path_failed(request)
+        if not self.path or self.hitbox.rect != self.destination:
+            return
+        col, row = self.path.pop(0)
+        dx = col * tile_map.data.tilewidth - self.destination.x
+        dy = row * tile_map.data.tileheight - self.destination.y
+        if dy < 0:
+            self.set_animation("walk_up")
+        elif dy > 0:
+            self.set_animation("walk_down")
+        elif dx < 0:
+            self.set_animation("walk_left")
+        elif dx > 0:
+            self.set_animation("walk_right")
+        if self.change_destination(dx, dy, tile_map) is not None:
+            self.path = []
+
+    def on_path_failed(self, _request):
+        """Called when the tile asked for in `walk_to` can't be reached.
+
+        The character stays where it is. Subclasses can pick another goal.
+        """
+
+    def think(self, tile_map):
+        """Decide what to do this frame. Called once per update for NPCs."""
+        self.follow_path(tile_map)
+
     def move(self, speed):
         """Move towards the character's target destination.
         
@@ -75,21 +140,18 @@ class Character(Entity):
 
     def update_appearance(self):
         """Update the character's sprite based on their current inventory."""
-        base_sprite = SPRITES_DIR / self.data["race"] / self.data["sprite"]
-        layers = [base_sprite]
-        for _, item in self.inventory.equipped.items():
-            if item:
-                if item.sprite_sheet is not None:
-                    layers.append(item.sprite_sheet)
-        layers.insert(0, base_sprite)
-        self.appearance.make_new_animation(layers)
-
-    def draw(self, screen, camera):
-        super().draw(screen, camera)
+        self.appearance.make_new_animation(get_sprite_layers(self.data, self.inventory))
+
+    def draw_debug(self, screen, camera):
+        super().draw_debug(screen, camera)
         ######### DEBUG RECTS ###########
         # Draw Destination rect
         pg.draw.rect(screen, (255,255,0), camera.apply_rect(self.destination), 2)
 
+    def get_draw_rect(self):
+        """Area of the map the character and its debug rects cover when drawn."""
+        return super().get_draw_rect().union(self.destination)
+
     def set_position(self, x, y):
         super().set_position(x, y)
         self.destination.x, self.destination.y = x, y
@@ -119,3 +181,19 @@ class Character(Entity):
             },
             "inventory": self.inventory.save()
         }
+
+def get_sprite_layers(data: dict, inventory: CharacterInventory) -> list[Path]:
+    """Get the sprite sheets a character is drawn from, bottom layer first.
+
+    Args:
+        data (dict): The character's saved data.
+        inventory (CharacterInventory): The character's inventory.
+    """
+    base_sprite = SPRITES_DIR / data["race"] / data["sprite"]
+    layers = [base_sprite]
+    for _, item in inventory.equipped.items():
+        if item:
+            if item.sprite_sheet is not None:
+                layers.append(item.sprite_sheet)
+    layers.insert(0, base_sprite)
+    return layers
@@ -4,9 +4,10 @@ This module is for anything drawn in the game.
 """
 from pathlib import Path
 import pygame as pg
-from utils.asset_management import get_anims_in_sprite_sheet, get_sprite_data
+from utils.asset_management import get_sheet_data
+from utils.sprite_atlas import ATLAS, get_blit
 
-from entities.animation import Animation
+from entities.animation import AnimationSet, AnimationPlayhead
 
 class Entity:
     """Entity class.
@@ -31,6 +32,11 @@ class Entity:
         """An entity's rect is just the hitbox rect."""
         return self.hitbox.rect
 
+    def get_draw_rect(self):
+        """Area of the map the entity covers when drawn."""
+        image_rect = self.appearance.get_image().get_rect(topleft=(self.x, self.y))
+        return image_rect.union(self.hitbox.rect)
+
     def set_position(self, x, y):
         self.x, self.y = x - self.hitbox.x_offset, y - self.hitbox.y_offset
         self.hitbox.rect.x, self.hitbox.rect.y = x, y
@@ -42,7 +48,15 @@ class Entity:
         Args:
             screen (pygame.Surface): The pygame surface to draw on.
         """
-        self.appearance.draw(screen, self.x + camera.rect.x, self.y + camera.rect.y)
+        screen.blit(*self.get_blit(camera))
+        self.draw_debug(screen, camera)
+
+    def get_blit(self, camera) -> tuple:
+        """Blit arguments for the entity's current image, for batching with `Surface.blits`."""
+        return self.appearance.get_blit(self.x + camera.rect.x, self.y + camera.rect.y)
+
+    def draw_debug(self, screen, camera):
+        """Draw the entity's debug rects over its image."""
         self.hitbox.draw(screen, camera)
 
     def update(self) -> None:
@@ -62,14 +76,21 @@ class Entity:
         """
         self.appearance.set_animation(anim)
 
+    def release_assets(self):
+        """Release the shared assets used to draw the entity."""
+        self.appearance.release()
+
 class EntityAppearance:
     """Handles the appearance and animations of an entity.
 
     This class manages the appearance and animations for any entity in the game.
+    The animation frames are shared with every entity using the same sprite sheets,
+    only the playhead is owned by this appearance.
 
     Attributes:
         sprite_sheet (str): The name of the sprite sheet for the entity.
-        anim_dict (dict): A dictionary containing animations for the entity.
+        animation_set (AnimationSet): The shared animations for the entity's layers.
+        playhead (AnimationPlayhead): Playback state of the current animation.
         current_anim (str): The name of the current animation to display. Used as a key
             for self.anim_dict
 
@@ -91,11 +112,17 @@ class EntityAppearance:
         if isinstance(sprite_sheet, Path):
             sprite_sheet = [sprite_sheet]  # Convert a single string to a list of one string
         self.sprite_sheet = sprite_sheet
-        self.anim_dict = self.initialize_anim_dict()
+        self.animation_set = AnimationSet.get(self.sprite_sheet, owner=self)
+        self.playhead = AnimationPlayhead()
         if anim:
             self.current_anim = anim
         else:
-            self.current_anim = list(self.anim_dict.keys())[0]
+            self.current_anim = self.animation_set.anim_names[0]
+
+    @property
+    def anim_dict(self):
+        """A dictionary where keys are animation names and values are Animation objects."""
+        return self.animation_set.animations
 
     def initialize_anim_dict(self):
         """
@@ -106,27 +133,18 @@ class EntityAppearance:
         Returns:
             dict: A dictionary where keys are animation names and values are Animation objects.
         """
-        # Load in body images
-        anim_dict = {}
-        anims = get_anims_in_sprite_sheet(self.sprite_sheet[0])
-        for anim in anims:
-            anim_dict[anim] = Animation(
-                sprite_sheets=self.sprite_sheet,
-                animation=anim
-            )
-        return anim_dict
+        self.animation_set = AnimationSet.get(self.sprite_sheet, owner=self)
+        return self.anim_dict
 
     def make_new_animation(self, sprite_sheets: list[Path]):
         """Replace the current layers with a new set of sprite sheets"""
-        # Load in body images
-        anim_dict = {}
-        anims = get_anims_in_sprite_sheet(sprite_sheets[0])
-        for anim in anims:
-            anim_dict[anim] = Animation(
-                sprite_sheets=sprite_sheets,
-                animation=anim
-            )
-        self.anim_dict = anim_dict
+        # Drop references to the old frames, frames still in use are re-acquired below
+        self.release()
+        self.animation_set = AnimationSet.get(sprite_sheets, owner=self)
+
+    def release(self):
+        """Release this appearance's references to its animation frames."""
+        ATLAS.release(self)
 
     def get_image(self):
         """Get the current image of the character.
@@ -134,11 +152,11 @@ class EntityAppearance:
         Returns:
             pygame.Surface: The current image of the character.
         """
-        return self.anim_dict[self.current_anim]
+        return self.playhead.get_current_frame(self.get_current_anim())
 
     def update(self, *_args, **_kwargs):
         """Update the character's animation."""
-        self.anim_dict[self.current_anim].update()
+        self.playhead.update(self.get_current_anim())
 
     def set_animation(self, anim):
         """Set the current animation for the character.
@@ -167,10 +185,11 @@ class EntityAppearance:
             x (int): The x-coordinate where the character should be drawn.
             y (int): The y-coordinate where the character should be drawn.
         """
-        screen.blit(
-            self.anim_dict[self.current_anim].get_current_frame(),
-            (x, y)
-        )
+        screen.blit(*self.get_blit(x, y))
+
+    def get_blit(self, x, y) -> tuple:
+        """Blit arguments drawing the character at a position, straight from the atlas."""
+        return get_blit(self.get_image(), (x, y))
 
 class HitBox:
     """An entity's hitbox.
@@ -178,25 +197,18 @@ class HitBox:
     Used for collision events.
     """
     def __init__(self, x_pos, y_pos, appearance) -> None:
-        data = get_sprite_data(appearance.sprite_sheet[0])
-        self.x_offset, self.y_offset = self.get_offset(appearance.sprite_sheet[0])
+        sheet = get_sheet_data(appearance.sprite_sheet[0])
+        self.x_offset, self.y_offset = sheet.hit_box_offset
         self.rect = pg.Rect(
             x_pos + self.x_offset,
             y_pos + self.y_offset,
-            data["sheet_data"]["hit_box_w"],
-            data["sheet_data"]["hit_box_h"]
+            sheet.hit_box_w,
+            sheet.hit_box_h
             )
 
     def get_offset(self, sprite):
         """Difference between a characters sprite size and hitbox."""
-        data = get_sprite_data(sprite)
-        frame_w = data["sheet_data"]["tile_w"]
-        frame_h = data["sheet_data"]["tile_h"]
-        hit_box_w = data["sheet_data"]["hit_box_w"]
-        hit_box_h = data["sheet_data"]["hit_box_h"]
-        x_offset = frame_w - hit_box_w
-        y_offset = frame_h - hit_box_h
-        return x_offset, y_offset
+        return get_sheet_data(sprite).hit_box_offset
 
     def move(self, x, y):
         """Move the hitbox."""
@@ -1,4 +1,6 @@
 import items
+import items.cloak
+import items.wand
 from items.item import Item
 from items.equippable import Equippable
 
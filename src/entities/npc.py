@@ -3,9 +3,9 @@
 Contains NPC specific logic.
 """
 
-import json
 from entities.characters import Character
 from config.directories import DATA_DIR
+from utils.asset_store import ASSETS
 
 class NPC(Character):
     """NPC Class.
@@ -20,8 +20,7 @@ class NPC(Character):
 
     def get_npc_data(self, name: str) -> dict:
         """Retrieves specific npc data from json file."""
-        with open(DATA_DIR / "npc_data.json", encoding="utf-8") as f:
-            npc_data = json.load(f)
+        npc_data = ASSETS.load_json(DATA_DIR / "npc_data.json")
         if name not in npc_data["npcs"]:
             raise KeyError(f"No NPC named {name} found in {DATA_DIR / 'npc_data.json'}")
         return npc_data["npcs"][name.lower()]
@@ -70,19 +70,19 @@ class PlayerCharacter(Character):
             self.interact_tile.x = self.destination.x + TILESIZE
             self.interact_tile.y = self.destination.y
 
-    def interact(self, map_objects, game_state):
+    def interact(self, tile_map, game_state):
         """Interact with map obstacles or other sprites."""
-        idx = self.interact_tile.collidelist(map_objects)
-        if idx != -1:
-            if hasattr(map_objects[idx], "interact"):
-                map_objects[idx].interact(game_state)
+        target = tile_map.collide(self.interact_tile, ignore=self)
+        if target is not None:
+            if hasattr(target, "interact"):
+                target.interact(game_state)
             else:
                 MessageBoxSubState(game_state, MessageBox("You can't interact with that...")).run()
         else:
             MessageBoxSubState(game_state, MessageBox("There's nothing there...")).run()
 
-    def draw(self, screen: pg.Surface, camera):
-        super().draw(screen, camera)
+    def draw_debug(self, screen: pg.Surface, camera):
+        super().draw_debug(screen, camera)
         # Draw the tile that a player would interact with if called
         if "idle" in self.appearance.current_anim:
             pg.draw.rect(screen, (0,255,0), camera.apply_rect(self.interact_tile), 2)
@@ -1,19 +1,27 @@
 import pygame as pg
 from gui.widget import Widget
+from gui.text_layout import TextLayout
 from config.colors import DARKGREY
-from config.directories import GUI_DIR
+from gui.skins import SKINS
 from config.game_settings import TILESIZE
 
 class MessageBox(Widget):
     def __init__(self, messages, color: str = "beigeLight", alignment = "bottom_center"):
-        image = pg.image.load(GUI_DIR / f"panel_{color}.png")
-        image = self.resize(image)
+        image = SKINS.get_panel(f"panel_{color}", self.get_panel_size())
         super().__init__(image, alignment=alignment)
-        self.font = pg.font.Font(None, 36)  # Choose your font and size
+        self.font = SKINS.get_font()
         if not isinstance(messages, list):
             messages = [messages]
         self.messages = messages
-        self.text_surfaces = [self.render_text(m) for m in messages]
+        # Lay out every slide up front, they are only rasterized when shown
+        self.layout = TextLayout(
+            self.font,
+            self.image.get_width() - self.padding * 2,
+            self.image.get_height() - self.padding * 2
+        )
+        self.slides = [self.layout.paginate(m) for m in messages]
+        self.slide_surface = None
+        self.slide_shown = None # (message_idx, tab_idx) of slide_surface
         self.message_idx = 0
         self.tab_idx = 0
         
@@ -22,54 +30,34 @@ class MessageBox(Widget):
         super().draw(screen)
         pos_x, pos_y = self.get_draw_position()
         # Render and draw the text
-        text_surface = self.text_surfaces[self.message_idx][self.tab_idx]
+        text_surface = self.get_slide()
         screen.blit(text_surface, (pos_x + self.padding, pos_y + self.padding))
 
-    def render_text(self, message):
-        w = self.image.get_width() - self.padding * 2
-        h = self.image.get_height() - self.padding * 2
-        surfaces = [] # Store all slides for current message
-        current_line = 0 # Row to render text to
-        current_x = 0 # Current start position
-        line_size = self.font.size("Tg")[1] # Max possible height
-        words = message.split(" ")
-        done_rendering = False
-        while not done_rendering:
-            text_surface = pg.Surface((w, h), pg.SRCALPHA)
-            text_surface.fill((0, 0, 0, 0))
-            word_counter = 0
-            for word in words:
-                word_counter += 1
-                text = self.font.render(f'{word} ', True, DARKGREY)
-                word_size = self.font.size(f'{word} ')
-                if word_size[0] + current_x > w:
-                    current_x = 0
-                    current_line += 1
-                if current_line*line_size + word_size[1] > h:
-                    current_x = 0
-                    current_line = 0
-                    break
-                text_surface.blit(text, (current_x,current_line*line_size))
-                current_x += word_size[0]
-            surfaces.append(text_surface)
-            if word_counter == len(words):
-                done_rendering = True
-            else:
-                words = words[word_counter:]
-        return surfaces
+    def get_slide(self) -> pg.Surface:
+        """Get the surface of the slide being shown, rasterizing it if needed.
 
-    def resize(self, image):
+        Only the current slide is kept, the previous one is dropped once the box
+        moves on.
+        """
+        shown = (self.message_idx, self.tab_idx)
+        if self.slide_shown != shown:
+            slide = self.slides[self.message_idx][self.tab_idx]
+            self.slide_surface = self.layout.render_slide(slide, DARKGREY)
+            self.slide_shown = shown
+        return self.slide_surface
+
+    def get_panel_size(self):
         x, y = self.get_screen_size_in_tiles()
         x = max(1, round((2 * x) / 3))
         y = max(1, round((y / 4)))
-        return pg.transform.scale(image, (TILESIZE * x, TILESIZE * y))
+        return (TILESIZE * x, TILESIZE * y)
     
     def next_tab(self):
         if self.next_tab_exists():
             self.tab_idx += 1
 
     def next_tab_exists(self):
-        return self.tab_idx < len(self.text_surfaces[self.message_idx]) - 1
+        return self.tab_idx < len(self.slides[self.message_idx]) - 1
 
     def next_message(self):
         if self.next_message_exists():
@@ -0,0 +1,131 @@
+"""
+Skins module.
+
+This module defines the `SkinCache` class, a process-wide store for the images
+and fonts the GUI is drawn with. Each image under `assets/gui` is loaded once,
+through the `SURFACES` cache, and panels are stretched to the size a widget
+needs with nine-slice scaling, keeping their corners and borders crisp.
+
+Scaled panels are memoized by (skin, size) and dropped when the screen is
+resized, since widgets are sized relative to the screen. Fonts are shared the
+same way, so widgets don't each construct their own.
+"""
+
+import pygame as pg
+from config.directories import GUI_DIR
+from config.menu_settings import PANEL_SLICE_BORDER, DEFAULT_FONT_SIZE
+from utils.display import DISPLAY
+from utils.surface_cache import SURFACES, convert_surface
+
+class SkinCache:
+    """
+    SkinCache Class
+
+    Shared GUI images, scaled panels and fonts.
+
+    Attributes:
+        panels (dict): Scaled panels keyed by (skin, size, border).
+        fonts (dict): Fonts keyed by (name, size).
+        hits (int): Number of panels served from the cache.
+        misses (int): Number of panels that had to be scaled.
+    """
+    def __init__(self) -> None:
+        self.panels = {}
+        self.fonts = {}
+        self.hits = 0
+        self.misses = 0
+        DISPLAY.subscribe(self.on_resize)
+
+    def get_image(self, skin: str) -> pg.Surface:
+        """Retrieve an image from `assets/gui` by name, such as "panel_beige".
+
+        Returns:
+            pg.Surface: The shared image. Callers must not draw onto it.
+        """
+        return SURFACES.load(GUI_DIR / f"{skin}.png", owner=self)
+
+    def get_panel(self, skin: str, size: tuple[int, int], border: int = PANEL_SLICE_BORDER) -> pg.Surface:
+        """Retrieve a GUI image scaled to a size with nine-slice scaling.
+
+        Args:
+            skin (str): Name of the image in `assets/gui`.
+            size (tuple[int, int]): Width and height of the panel.
+            border (int): Width of the edges that are not stretched.
+
+        Returns:
+            pg.Surface: The shared panel. Callers must not draw onto it.
+        """
+        key = (skin, (int(size[0]), int(size[1])), border)
+        panel = self.panels.get(key)
+        if panel is None:
+            self.misses += 1
+            panel = nine_slice(self.get_image(skin), key[1], border)
+            self.panels[key] = panel
+        else:
+            self.hits += 1
+        return panel
+
+    def get_font(self, name: str = None, size: int = DEFAULT_FONT_SIZE) -> pg.font.Font:
+        """Retrieve a shared font.
+
+        Args:
+            name (str, optional): Path to a font file. Defaults to pygame's font.
+            size (int): Size of the font.
+        """
+        key = (name, size)
+        font = self.fonts.get(key)
+        if font is None:
+            font = pg.font.Font(name, size)
+            self.fonts[key] = font
+        return font
+
+    def on_resize(self, _size):
+        """Drop the scaled panels, widgets are sized relative to the screen."""
+        self.panels.clear()
+
+    def get_stats(self) -> dict:
+        """Retrieve the hit/miss counters and number of cached panels and fonts."""
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "panels" : len(self.panels),
+            "fonts" : len(self.fonts)
+        }
+
+SKINS = SkinCache()
+
+def nine_slice(image: pg.Surface, size: tuple[int, int], border: int) -> pg.Surface:
+    """Scale an image keeping its corners as they are.
+
+    The image is cut into a 3x3 grid, `border` pixels in from its edges. Corners
+    are copied as is, edges are stretched along their length and the center is
+    stretched both ways.
+
+    Args:
+        image (pg.Surface): The image to scale.
+        size (tuple[int, int]): Width and height of the result.
+        border (int): Width of the edges, reduced if the image or size is too small.
+
+    Returns:
+        pg.Surface: The scaled image.
+    """
+    width, height = size
+    src_w, src_h = image.get_size()
+    border = max(0, min(border, (src_w - 1) // 2, (src_h - 1) // 2, width // 2, height // 2))
+    surface = convert_surface(pg.Surface(size, pg.SRCALPHA))
+    src_cols = (0, border, src_w - border, src_w)
+    src_rows = (0, border, src_h - border, src_h)
+    cols = (0, border, width - border, width)
+    rows = (0, border, height - border, height)
+    for row in range(3):
+        for col in range(3):
+            dest = pg.Rect(cols[col], rows[row], cols[col + 1] - cols[col], rows[row + 1] - rows[row])
+            if dest.width <= 0 or dest.height <= 0:
+                continue
+            area = pg.Rect(
+                src_cols[col], src_rows[row],
+                src_cols[col + 1] - src_cols[col], src_rows[row + 1] - src_rows[row]
+            )
+            # Scaling straight into the panel copies the pixels without blending
+            pg.transform.scale(image.subsurface(area), dest.size, surface.subsurface(dest))
+    return surface
@@ -0,0 +1,101 @@
+"""
+Text Cache module.
+
+This module defines the `TextCache` class, a process-wide store of rendered text
+surfaces keyed by (font, string, color, antialias), so the same text is only
+rasterized once. `TextLayer` builds on it to keep the lines of a screen, such as
+a menu, and only looks up the lines whose text or color changed since they were
+last drawn.
+"""
+
+from collections import OrderedDict
+import pygame as pg
+from config.cache_settings import TEXT_CACHE_SIZE
+
+class TextCache:
+    """Least recently used cache of rendered text.
+
+    Args:
+        max_entries (int): Number of rendered strings to keep.
+
+    Attributes:
+        hits (int): Number of renders served from the cache.
+        misses (int): Number of renders that had to rasterize the text.
+    """
+    def __init__(self, max_entries: int = TEXT_CACHE_SIZE) -> None:
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font: pg.font.Font, text: str, antialias: bool, color) -> pg.Surface:
+        """Retrieve the surface of some text, rendering it if needed.
+
+        Takes the same arguments as `pg.font.Font.render`.
+
+        Returns:
+            pg.Surface: The shared surface. Callers must not draw onto it.
+        """
+        key = (font, text, tuple(color), antialias)
+        surface = self._entries.get(key)
+        if surface is None:
+            self.misses += 1
+            surface = font.render(text, antialias, color)
+            self._entries[key] = surface
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return surface
+
+    def clear(self):
+        """Drop every rendered string."""
+        self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """Retrieve the hit/miss counters and number of cached strings."""
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "entries" : len(self._entries)
+        }
+
+TEXT = TextCache()
+
+class TextLayer:
+    """The lines of text drawn on a screen, kept between frames.
+
+    Set every line each frame with `set_line`. Lines whose text, color and
+    position haven't changed are kept as they are, so drawing the layer is just
+    one blit per line.
+
+    Args:
+        cache (TextCache, optional): Where text is rendered. Defaults to `TEXT`.
+    """
+    def __init__(self, cache: TextCache = None) -> None:
+        self.cache = cache if cache is not None else TEXT
+        self.lines = {} # name -> (key, surface, rect)
+
+    def set_line(self, name, font: pg.font.Font, text: str, color, center, antialias: bool = True):
+        """Set the text of a line, centered on a position.
+
+        Args:
+            name: Identifies the line in the layer.
+            font (pg.font.Font): Font the line is rendered with.
+            text (str): The line's text.
+            color: The line's color.
+            center (tuple[int, int]): Where the line is centered on the screen.
+            antialias (bool): Whether the text is antialiased.
+        """
+        key = (font, text, tuple(color), antialias)
+        line = self.lines.get(name)
+        if line is None or line[0] != key:
+            surface = self.cache.render(font, text, antialias, color)
+            self.lines[name] = (key, surface, surface.get_rect(center=center))
+        elif line[2].center != tuple(center):
+            line[2].center = center
+
+    def draw(self, screen: pg.Surface):
+        """Draw every line."""
+        screen.blits([(surface, rect) for _, surface, rect in self.lines.values()], doreturn=False)
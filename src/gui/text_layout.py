@@ -0,0 +1,119 @@
+"""
+Text Layout module.
+
+This module lays out text in a box, breaking it into lines and splitting the
+lines into slides (pages), using only font metrics. Nothing is rasterized until
+a slide is drawn, so long texts are laid out instantly and only the slide being
+shown needs a surface.
+
+Word sizes are measured once per font and kept in a `FontMetrics` cache shared by
+every layout using that font. Words are rendered through `WORDS`, a text cache of
+their own, so a long message doesn't push the menus' lines out of `TEXT`.
+"""
+
+import weakref
+import pygame as pg
+from config.cache_settings import TEXT_WORD_CACHE_SIZE
+from gui.text_cache import TextCache
+
+class FontMetrics:
+    """Cached measurements of the text drawn with a font.
+
+    Args:
+        font (pg.font.Font): The font to measure.
+
+    Attributes:
+        line_size (int): Height of a line, tall enough for any glyph.
+        hits (int): Number of measurements served from the cache.
+        misses (int): Number of measurements that had to ask the font.
+    """
+    def __init__(self, font: pg.font.Font) -> None:
+        self.font = weakref.proxy(font)
+        self.line_size = font.size("Tg")[1] # Max possible height
+        self.sizes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_size(self, text: str) -> tuple[int, int]:
+        """Width and height of some text drawn with the font."""
+        size = self.sizes.get(text)
+        if size is None:
+            self.misses += 1
+            size = self.font.size(text)
+            self.sizes[text] = size
+        else:
+            self.hits += 1
+        return size
+
+_metrics = weakref.WeakKeyDictionary()
+
+WORDS = TextCache(TEXT_WORD_CACHE_SIZE)
+
+def get_font_metrics(font: pg.font.Font) -> FontMetrics:
+    """Retrieve the shared metrics cache of a font."""
+    metrics = _metrics.get(font)
+    if metrics is None:
+        metrics = FontMetrics(font)
+        _metrics[font] = metrics
+    return metrics
+
+class TextLayout:
+    """Word wrapping and pagination of text in a fixed size box.
+
+    Args:
+        font (pg.font.Font): Font the text is drawn with.
+        width (int): Width of the box.
+        height (int): Height of the box.
+        cache (TextCache, optional): Where words are rendered. Defaults to `WORDS`.
+    """
+    def __init__(self, font: pg.font.Font, width: int, height: int, cache: TextCache = None) -> None:
+        self.font = font
+        self.metrics = get_font_metrics(font)
+        self.width = width
+        self.height = height
+        self.cache = cache if cache is not None else WORDS
+
+    def paginate(self, text: str) -> list[list[tuple[str, tuple[int, int]]]]:
+        """Split text into the slides it takes to show it in the box.
+
+        Words are separated by spaces and wrapped onto a new line when they
+        don't fit on the current one. A slide ends when the next line doesn't
+        fit in the box. Every slide holds at least one word.
+
+        Returns:
+            list: Each slide's words, each with the position it is drawn at.
+        """
+        line_size = self.metrics.line_size
+        slides = []
+        slide = []
+        x = 0
+        line = 0
+        for word in text.split(" "):
+            word = f"{word} "
+            word_w, word_h = self.metrics.get_size(word)
+            if x > 0 and x + word_w > self.width:
+                x = 0
+                line += 1
+            if slide and line * line_size + word_h > self.height:
+                slides.append(slide)
+                slide = []
+                x = 0
+                line = 0
+            slide.append((word, (x, line * line_size)))
+            x += word_w
+        slides.append(slide)
+        return slides
+
+    def render_slide(self, slide: list, color, antialias: bool = True) -> pg.Surface:
+        """Rasterize a slide onto a transparent surface the size of the box.
+
+        Words are rendered through the layout's word cache, so words that
+        repeat are only rasterized once.
+        """
+        surface = pg.Surface((self.width, self.height), pg.SRCALPHA)
+        surface.fill((0, 0, 0, 0))
+        surface.blits([
+            (self.cache.render(self.font, word, antialias, color), pos)
+            for word, pos in slide
+        ], doreturn=False)
+        return surface
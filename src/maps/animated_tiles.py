@@ -1,20 +1,30 @@
+"""Animated tiles.
+
+Cells that play the same frame sequence are always on the same frame, so they
+share a single `AnimatedTileGroup` clock. Updating the map only advances each
+group once per frame, no matter how many cells use it.
+"""
 import pygame as pg
 from config.game_settings import FPS
 
-class AnimatedTile:
-    """A parent class for objects that are animated directly in the map.
-    
+class AnimatedTileGroup:
+    """A frame sequence and the clock shared by every tile that plays it.
+
     Params:
-        - frames: A list of AnimationFrame objects from pytmx. The property
-        "gid" can be used to load the image and the property "duration" is
-        the time in milliseconds the frame should be displayed/
-        - rect: pg.Rect that represents the objects hitbox.
+        - frames: A list of (image: pg.Surface, duration: int) tuples, where
+        duration is the time in milliseconds the frame should be displayed.
     """
-    def __init__(self, frames, rect: pg.Rect):
+    def __init__(self, frames):
         self.frames = frames
         self.frame_time = 0
         self.curr_frame = 0
-        self.rect = rect
+        self.tiles = []
+
+    def add_tile(self, rect: pg.Rect):
+        """Create a tile at a location that plays this group's animation."""
+        tile = AnimatedTile(self.frames, rect, group=self)
+        self.tiles.append(tile)
+        return tile
 
     def update(self):
         """Add time and switch frames if needed."""
@@ -26,9 +36,63 @@ class AnimatedTile:
         if self.curr_frame >= len(self.frames):
             self.curr_frame = 0
 
+    def get_image(self) -> pg.Surface:
+        """Get the image of the current frame."""
+        return self.frames[self.curr_frame][0]
+
+    def get_schedule(self) -> list[int]:
+        """Get the frame shown after each update over one full cycle.
+
+        The cycle starts on the first frame, so the group's current frame is
+        always `schedule[updates % len(schedule)]`.
+        """
+        clock = AnimatedTileGroup(self.frames)
+        schedule = [clock.curr_frame]
+        clock.update()
+        while clock.curr_frame != 0 or clock.frame_time != 0:
+            schedule.append(clock.curr_frame)
+            clock.update()
+        return schedule
+
+class AnimatedTile:
+    """A parent class for objects that are animated directly in the map.
+
+    Params:
+        - frames: A list of AnimationFrame objects from pytmx. The property
+        "gid" can be used to load the image and the property "duration" is
+        the time in milliseconds the frame should be displayed/
+        - rect: pg.Rect that represents the objects hitbox.
+        - group: The AnimatedTileGroup whose clock the tile follows. A tile
+        without a group gets a clock of its own.
+    """
+    def __init__(self, frames, rect: pg.Rect, group: AnimatedTileGroup = None):
+        if group is None:
+            group = AnimatedTileGroup(frames)
+            group.tiles.append(self)
+        self.group = group
+        self.rect = rect
+
+    @property
+    def frames(self):
+        """The frames of the tile's animation."""
+        return self.group.frames
+
+    @property
+    def curr_frame(self):
+        """Index of the frame currently shown."""
+        return self.group.curr_frame
+
+    def update(self):
+        """Advance the tile's clock.
+
+        Tiles in a shared group should be updated through the group instead,
+        otherwise the group advances once per tile.
+        """
+        self.group.update()
+
     def draw(self, screen, camera):
         """Draw the current frame to the screen."""
         screen.blit(
-            self.frames[self.curr_frame][0],
+            self.group.get_image(),
             camera.apply_rect(self.rect)
         )
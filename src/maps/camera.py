@@ -9,6 +9,7 @@ they move with the camera's view and stay within the boundaries of the game worl
 """
 
 import pygame as pg
+from utils.display import DISPLAY
 
 class Camera:
     """
@@ -33,9 +34,8 @@ class Camera:
         self.rect = pg.Rect(0,0, width, height)
         self.width = width
         self.height = height
-        info = pg.display.Info()
-        self.screen_h = info.current_h
-        self.screen_w = info.current_w
+        self.screen_w, self.screen_h = DISPLAY.size
+        DISPLAY.subscribe(self.change_screen_size)
 
     def open_map(self, tile_map):
         """Set the camera width and height to match a given map."""
@@ -43,11 +43,18 @@ class Camera:
         self.height = tile_map.height
         self.rect = pg.Rect(0,0, self.width, self.height)
 
-    def change_screen_size(self):
-        """Get the new width and height of the screen. """
-        info = pg.display.Info()
-        self.screen_h = info.current_h
-        self.screen_w = info.current_w
+    def change_screen_size(self, size: tuple[int, int]):
+        """Set the new width and height of the screen. """
+        self.screen_w, self.screen_h = size
+
+    def get_view_rect(self):
+        """
+        Get the area of the map currently shown on screen.
+
+        Returns:
+            Rect: The visible area in map coordinates.
+        """
+        return pg.Rect(-self.rect.x, -self.rect.y, self.screen_w, self.screen_h)
 
     def apply(self, entity):
         """
@@ -0,0 +1,208 @@
+"""
+Chunks Module
+
+This module defines the `ChunkedMapRenderer` class, which draws the static tile
+layers of a `TiledMap` in fixed-size chunks. Chunks are rendered the first time
+they become visible and kept in a small LRU cache, and only chunks intersecting
+the camera's view are drawn. Memory use therefore depends on screen size rather
+than map size.
+
+Chunks containing animated tiles pre-bake every combination of frames their
+tiles show over a full animation cycle, so drawing the chunk is still a single
+blit. Chunks whose cycle is too long, or whose frames would not fit in the
+memory budget, keep their animated tiles drawn one by one by the map.
+"""
+
+from collections import OrderedDict
+import math
+import pygame as pg
+from config.cache_settings import (
+    CHUNK_SIZE, CHUNK_CACHE_SIZE, ANIMATED_CHUNK_BUDGET, ANIMATED_CHUNK_MAX_CYCLE
+)
+
+class ChunkedMapRenderer:
+    """
+    ChunkedMapRenderer Class
+
+    Renders and draws the static (non-animated) tiles of a map.
+
+    Args:
+        tile_map (TiledMap): The map to render.
+        chunk_size (int): Width and height of a chunk in tiles.
+        max_chunks (int): Number of rendered chunks to keep in memory.
+        animated_budget (int): Bytes of pre-baked animated chunk frames allowed.
+        max_cycle (int): Longest animation cycle, in updates, that a chunk pre-bakes.
+
+    Attributes:
+        chunk_w (int): Width of a chunk in pixels.
+        chunk_h (int): Height of a chunk in pixels.
+        cols (int): Number of chunk columns in the map.
+        rows (int): Number of chunk rows in the map.
+        chunks (OrderedDict): Rendered chunk surfaces keyed by (col, row),
+            least recently drawn first.
+        animated_chunks (dict): The tile groups and tiles baked into each animated
+            chunk, keyed by (col, row).
+        baked_frames (dict): Pre-baked surfaces of each animated chunk, keyed by
+            (col, row) and then by the frame index of each of the chunk's groups.
+        baked_tiles (set[AnimatedTile]): Animated tiles fully drawn by baked chunks.
+    """
+    def __init__(
+            self,
+            tile_map,
+            chunk_size: int = CHUNK_SIZE,
+            max_chunks: int = CHUNK_CACHE_SIZE,
+            animated_budget: int = ANIMATED_CHUNK_BUDGET,
+            max_cycle: int = ANIMATED_CHUNK_MAX_CYCLE
+    ):
+        self.map = tile_map
+        data = tile_map.data
+        self.chunk_size = chunk_size
+        self.max_chunks = max_chunks
+        self.chunk_w = chunk_size * data.tilewidth
+        self.chunk_h = chunk_size * data.tileheight
+        self.cols = math.ceil(tile_map.width / self.chunk_w)
+        self.rows = math.ceil(tile_map.height / self.chunk_h)
+        self.chunks = OrderedDict()
+        self.animated_chunks = {}
+        self.baked_frames = {}
+        self.baked_tiles = set()
+        self.plan_animated_chunks(animated_budget, max_cycle)
+
+    def plan_animated_chunks(self, budget: int, max_cycle: int):
+        """Decide which chunks pre-bake their animated tiles.
+
+        The states a chunk can show are found by stepping its groups' schedules
+        together over the least common multiple of their cycles. A chunk is baked
+        if that cycle is short enough and its states fit in the remaining budget.
+        """
+        chunk_tiles = {}
+        for tile in self.map.items['tiles']:
+            for key in self.get_visible_chunks(tile.rect):
+                chunk_tiles.setdefault(key, []).append(tile)
+        schedules = {}
+        planned = set()
+        for key, tiles in chunk_tiles.items():
+            groups = list(dict.fromkeys(tile.group for tile in tiles))
+            for group in groups:
+                if group not in schedules:
+                    schedules[group] = group.get_schedule()
+            cycle = math.lcm(*(len(schedules[group]) for group in groups))
+            if cycle > max_cycle:
+                continue
+            states = {
+                tuple(schedules[group][tick % len(schedules[group])] for group in groups)
+                for tick in range(cycle)
+            }
+            size = self.get_chunk_rect(*key).size
+            cost = len(states) * size[0] * size[1] * 4
+            if cost > budget:
+                continue
+            budget -= cost
+            self.animated_chunks[key] = (
+                tuple(groups),
+                [(tile, groups.index(tile.group)) for tile in tiles]
+            )
+            planned.add(key)
+        # A tile is only left out of the map's drawing if every chunk it touches bakes it
+        for tile in self.map.items['tiles']:
+            if all(key in planned for key in self.get_visible_chunks(tile.rect)):
+                self.baked_tiles.add(tile)
+
+    def draw(self, screen, camera):
+        """Draw every chunk that intersects the camera's view.
+
+        Args:
+            screen (pygame.Surface): The pygame surface to draw on.
+            camera (Camera): The camera used to offset the chunks.
+        """
+        for col, row in self.get_visible_chunks(camera.get_view_rect()):
+            chunk = self.get_chunk(col, row)
+            if (col, row) in self.animated_chunks:
+                chunk = self.get_baked_frame(col, row)
+            screen.blit(chunk, camera.apply_rect(self.get_chunk_rect(col, row)))
+
+    def get_visible_chunks(self, view: pg.Rect) -> list[tuple[int, int]]:
+        """Get the (col, row) of every chunk intersecting a rect in map coordinates."""
+        first_col = max(0, view.left // self.chunk_w)
+        last_col = min(self.cols - 1, (view.right - 1) // self.chunk_w)
+        first_row = max(0, view.top // self.chunk_h)
+        last_row = min(self.rows - 1, (view.bottom - 1) // self.chunk_h)
+        return [
+            (col, row)
+            for row in range(first_row, last_row + 1)
+            for col in range(first_col, last_col + 1)
+        ]
+
+    def get_chunk_rect(self, col: int, row: int) -> pg.Rect:
+        """Area of the map covered by a chunk, clipped to the map's edges."""
+        rect = pg.Rect(col * self.chunk_w, row * self.chunk_h, self.chunk_w, self.chunk_h)
+        return rect.clip(pg.Rect(0, 0, self.map.width, self.map.height))
+
+    def get_chunk(self, col: int, row: int) -> pg.Surface:
+        """Get a chunk's surface, rendering it if it isn't cached."""
+        key = (col, row)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key]
+        chunk = self.render_chunk(col, row)
+        self.chunks[key] = chunk
+        if key in self.animated_chunks:
+            self.bake_chunk(col, row)
+        while len(self.chunks) > self.max_chunks:
+            evicted, _ = self.chunks.popitem(last=False)
+            self.baked_frames.pop(evicted, None)
+        return chunk
+
+    def get_baked_frame(self, col: int, row: int) -> pg.Surface:
+        """Get the pre-baked surface of an animated chunk for its groups' current frames."""
+        groups, _ = self.animated_chunks[(col, row)]
+        state = tuple(group.curr_frame for group in groups)
+        frames = self.baked_frames.setdefault((col, row), {})
+        if state not in frames:
+            frames[state] = self.bake_frame(col, row, state)
+        return frames[state]
+
+    def bake_chunk(self, col: int, row: int):
+        """Pre-bake every state an animated chunk shows over its animation cycle."""
+        groups, _ = self.animated_chunks[(col, row)]
+        schedules = [group.get_schedule() for group in groups]
+        cycle = math.lcm(*(len(schedule) for schedule in schedules))
+        frames = self.baked_frames.setdefault((col, row), {})
+        for tick in range(cycle):
+            state = tuple(schedule[tick % len(schedule)] for schedule in schedules)
+            if state not in frames:
+                frames[state] = self.bake_frame(col, row, state)
+
+    def bake_frame(self, col: int, row: int, state: tuple[int, ...]) -> pg.Surface:
+        """Draw an animated chunk's tiles, on the given frames, over its static image."""
+        groups, tiles = self.animated_chunks[(col, row)]
+        rect = self.get_chunk_rect(col, row)
+        surface = self.get_chunk(col, row).copy()
+        for tile, index in tiles:
+            image = groups[index].frames[state[index]][0]
+            surface.blit(image, (tile.rect.x - rect.x, tile.rect.y - rect.y))
+        return surface
+
+    def render_chunk(self, col: int, row: int) -> pg.Surface:
+        """Create the image for a single chunk."""
+        return self.map.data.render_area(self.get_chunk_rect(col, row))
+
+    def prerender(self, area: pg.Rect):
+        """Render every chunk intersecting an area of the map ahead of time."""
+        for col, row in self.get_visible_chunks(area):
+            self.get_chunk(col, row)
+
+    def clear(self):
+        """Drop every rendered chunk."""
+        self.chunks.clear()
+        self.baked_frames.clear()
+
+    def get_memory_usage(self) -> int:
+        """Bytes of pixel data held by the rendered chunks."""
+        surfaces = list(self.chunks.values())
+        for frames in self.baked_frames.values():
+            surfaces += frames.values()
+        return sum(
+            chunk.get_width() * chunk.get_height() * chunk.get_bytesize()
+            for chunk in surfaces
+        )
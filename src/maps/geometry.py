@@ -0,0 +1,88 @@
+"""
+Geometry Module
+
+This module contains helpers for the collision geometry of a map. Walls drawn
+tile by tile in Tiled produce many small rects; `merge_rects` combines them into
+fewer, larger rects covering exactly the same area.
+"""
+
+import pygame as pg
+
+def merge_rects(rects: list[pg.Rect]) -> list[pg.Rect]:
+    """Merge adjacent and overlapping rects into a smaller set of rects.
+
+    The plane is split into cells along every rect edge. Starting from each cell
+    not yet covered, a rect is grown in every direction for as long as the cells
+    along its edge are all part of the input. Rects made redundant by the ones
+    grown after them are then dropped. The result covers exactly the same area as
+    the input, and is never longer than it.
+
+    Args:
+        rects (list[pg.Rect]): The rects to merge.
+
+    Returns:
+        list[pg.Rect]: The merged rects.
+    """
+    rects = [pg.Rect(rect) for rect in rects if rect.width > 0 and rect.height > 0]
+    if len(rects) < 2:
+        return rects
+    xs = sorted({x for rect in rects for x in (rect.left, rect.right)})
+    ys = sorted({y for rect in rects for y in (rect.top, rect.bottom)})
+    col_of = {x: i for i, x in enumerate(xs)}
+    row_of = {y: i for i, y in enumerate(ys)}
+    cols, rows = len(xs) - 1, len(ys) - 1
+    solid = [[False] * cols for _ in range(rows)]
+    for rect in rects:
+        for row in range(row_of[rect.top], row_of[rect.bottom]):
+            for col in range(col_of[rect.left], col_of[rect.right]):
+                solid[row][col] = True
+
+    def is_solid(left, top, right, bottom):
+        return all(
+            solid[row][col]
+            for row in range(top, bottom)
+            for col in range(left, right)
+        )
+
+    # Grow a maximal rect, in cell bounds, from every cell not covered yet
+    coverage = [[0] * cols for _ in range(rows)]
+    grown = []
+    for row in range(rows):
+        for col in range(cols):
+            if not solid[row][col] or coverage[row][col]:
+                continue
+            left, top, right, bottom = col, row, col + 1, row + 1
+            growing = True
+            while growing:
+                growing = False
+                if right < cols and is_solid(right, top, right + 1, bottom):
+                    right += 1
+                    growing = True
+                if bottom < rows and is_solid(left, bottom, right, bottom + 1):
+                    bottom += 1
+                    growing = True
+                if left > 0 and is_solid(left - 1, top, left, bottom):
+                    left -= 1
+                    growing = True
+                if top > 0 and is_solid(left, top - 1, right, top):
+                    top -= 1
+                    growing = True
+            for r in range(top, bottom):
+                for c in range(left, right):
+                    coverage[r][c] += 1
+            grown.append((left, top, right, bottom))
+
+    # Drop rects whose every cell is also covered by another rect, smallest first
+    merged = []
+    for left, top, right, bottom in sorted(
+            grown, key=lambda b: (xs[b[2]] - xs[b[0]]) * (ys[b[3]] - ys[b[1]])):
+        cells = [(r, c) for r in range(top, bottom) for c in range(left, right)]
+        if all(coverage[r][c] > 1 for r, c in cells):
+            for r, c in cells:
+                coverage[r][c] -= 1
+        else:
+            merged.append(pg.Rect(xs[left], ys[top], xs[right] - xs[left], ys[bottom] - ys[top]))
+    if len(merged) >= len(rects):
+        return rects
+    merged.sort(key=lambda rect: (rect.top, rect.left))
+    return merged
@@ -3,12 +3,19 @@ TiledMap Module
 
 This module defines the `TiledMap` class, which represents a Tiled map loaded from a TMX file.
 It provides functionality to render and draw the map on a Pygame surface.
+Static tiles are drawn in chunks by a `ChunkedMapRenderer`.
+The map's contents are loaded as `MapData`, from the map's compiled cache when it
+is up to date.
 """
 import pygame as pg
-import pytmx
-from config.directories import MAP_DIR
 from maps.obstacles import Obstacle, AnimatedObstacle
-from maps.animated_tiles import AnimatedTile
+from maps.animated_tiles import AnimatedTileGroup
+from maps.chunks import ChunkedMapRenderer
+from maps.map_data import MapData
+from maps.tilesets import TILESETS
+from maps.spatial import SpatialHash
+from maps.occupancy import OccupancyGrid
+from maps.pathfinding import PathfindingService
 from maps.portals import Portal, Door
 from maps.trees import Tree, MagicTree
 
@@ -26,40 +33,66 @@ class TiledMap:
         name (str): The name of the Tiled map.
         width (int): The width of the map in pixels.
         height (int): The height of the map in pixels.
-        tmxdata (pytmx.TiledMapData): The loaded Tiled map data.
-        image (pygame.Surface): The Pygame surface representing the map's image.
+        data (MapData): The processed contents of the map.
+        tmxdata (pytmx.TiledMapData): The loaded Tiled map data, or None if the map
+            was loaded from its compiled cache.
+        tile_groups (list[AnimatedTileGroup]): One group per animated frame sequence.
+            Every animated cell playing the same sequence shares its group's clock.
+        renderer (ChunkedMapRenderer): Renders and draws the map's static tiles.
+        visibility (dict[str, SpatialHash]): Spatial indexes of the drawable items,
+            used to skip items outside the camera's view.
+        cull_stats (dict): How many items were drawn and culled in the last draw call.
+        obstacle_stats (dict): How many wall rects the map had before and after merging.
+        collisions (dict[str, SpatialHash]): Spatial indexes of the obstacles, entities
+            and portals characters collide with, checked in that order.
+        occupancy (OccupancyGrid): What is on each tile, checked before the collision
+            indexes so steps onto empty tiles cost a single array lookup.
+        pathfinding (PathfindingService): Plans routes across the map for NPCs.
 
     Methods:
-        render(surface): Create the image for the map.
-        make_map(): Create a Pygame surface that can be Blit to the screen.
+        load_animated_tiles(): Create the animated tiles in the map, grouped by animation.
         draw(screen): Draw the map's image to the screen.
 
     """
-    def __init__(self, map_name):
+    def __init__(self, map_name, data: MapData = None):
         """
         Initialize a TiledMap object.
 
         Args:
             map_name (str): The name of the Tiled map.
+            data (MapData, optional): The map's already loaded and converted
+                data. Loaded from the map's files if not given.
         """
         self.name = map_name
-        tm = pytmx.load_pygame(MAP_DIR / f"{map_name}.tmx", pixelalpha = True)
-        self.width = tm.width * tm.tilewidth
-        self.height =tm.height * tm.tileheight
-        self.tmxdata = tm
+        self.data = data if data is not None else MapData.load(map_name, owner=self)
+        self.width = self.data.width * self.data.tilewidth
+        self.height = self.data.height * self.data.tileheight
+        self.tmxdata = self.data.tmxdata
         self.items = {
             'animated' : [], # probably delete - move to draw and update list
             'obstacles' : [], # Walls, lamps, etc
             'portals' : [], # Doors, portals, etc.
             'tiles' : [], # probably move out of items
+            'entities' : [], # NPCs, animals, etc. added when the map is opened
             'draw_list' : [], # things to be drawn during draw loop
             'update_list' : [], # things to be updated in update loop
             'collision_list' : [] # things that can 
         }
         self.items['obstacles'] = self.get_obstacles()
         self.items['portals'] = self.get_portals()
-        self.image = self.make_map()
-        self.rect = self.image.get_rect()
+        self.tile_groups = []
+        self.load_animated_tiles()
+        self.renderer = ChunkedMapRenderer(self)
+        self.visibility = self.make_visibility_index()
+        self.cull_stats = {"drawn" : 0, "culled" : 0}
+        self.collisions = {
+            'obstacles' : self.visibility['obstacles'],
+            'entities' : SpatialHash(),
+            'portals' : self.visibility['portals']
+        }
+        self.occupancy = OccupancyGrid.from_map(self)
+        self.pathfinding = PathfindingService(self.occupancy)
+        self.rect = pg.Rect(0, 0, self.width, self.height)
         #self.obstacles = self.get_obstacles()
 
     def draw(self, screen, camera):
@@ -69,127 +102,167 @@ class TiledMap:
             screen (pygame.Surface): The pygame surface to draw on.
         """
         # Draw static image
-        screen.blit(self.image, camera.apply(self))
-        # Draw animated images
-        for tile in self.items['tiles']:
-            tile.draw(screen, camera)
-        for item in self.items['animated']:
-            item.draw(screen, camera)
-        for item in self.items['portals']:
-            item.draw(screen, camera)
+        self.renderer.draw(screen, camera)
+        # Draw animated images on screen
+        view = camera.get_view_rect()
+        drawn = 0
+        for group in ('tiles', 'animated', 'portals'):
+            for item in self.visibility[group].query_rect(view):
+                # Tiles baked into their chunks were already drawn with them
+                if item not in self.renderer.baked_tiles:
+                    item.draw(screen, camera)
+                drawn += 1
         # Draw debug boxes
-        for obstacle in self.items["obstacles"]:
+        for obstacle in self.visibility['obstacles'].query_rect(view):
             pg.draw.rect(screen, (255,255,255), camera.apply(obstacle), 2)
+            drawn += 1
+        total = sum(len(index) for index in self.visibility.values())
+        self.cull_stats = {"drawn" : drawn, "culled" : total - drawn}
+
+    def add_entity(self, entity):
+        """Add a dynamic entity, such as an NPC, that other characters collide with."""
+        self.items['entities'].append(entity)
+        self.collisions['entities'].insert(entity)
+        self.occupancy.place_entity(entity)
+
+    def move_entity(self, entity):
+        """Update an entity's location in the collision index after it moved."""
+        self.collisions['entities'].move(entity)
+        self.occupancy.place_entity(entity)
+
+    def remove_entity(self, entity):
+        """Remove a dynamic entity from the map."""
+        if entity in self.items['entities']:
+            self.items['entities'].remove(entity)
+        self.collisions['entities'].remove(entity)
+        self.occupancy.remove_entity(entity)
+
+    def clear_entities(self):
+        """Remove every dynamic entity from the map."""
+        self.items['entities'] = []
+        self.collisions['entities'].clear()
+        self.occupancy.clear_entities()
+
+    def collide(self, rect: pg.Rect, ignore = None):
+        """Get the first obstacle, entity or portal a rect collides with.
+
+        Args:
+            rect (pg.Rect): The area to check.
+            ignore (optional): An object to leave out, e.g. the character moving.
+
+        Returns:
+            The object collided with, or None if the area is clear.
+        """
+        if self.occupancy.is_rect_clear(rect):
+            return None
+        for index in self.collisions.values():
+            if (hit := index.first_collision(rect, ignore)) is not None:
+                return hit
+        return None
+
+    def get_tile_at(self, x: int, y: int) -> tuple[int, int]:
+        """Get the (col, row) of the tile containing a point."""
+        return (x // self.data.tilewidth, y // self.data.tileheight)
+
+    def get_tile_contents(self, col: int, row: int) -> list:
+        """Get every obstacle, entity and portal on a tile."""
+        if not self.occupancy.get(col, row) and not self.occupancy.has_entity(col, row):
+            return []
+        rect = pg.Rect(
+            col * self.data.tilewidth,
+            row * self.data.tileheight,
+            self.data.tilewidth,
+            self.data.tileheight
+        )
+        contents = []
+        for index in self.collisions.values():
+            contents += index.query_rect(rect)
+        return contents
+
+    def get_memory_usage(self) -> int:
+        """Estimated bytes of pixel data held by the map.
+
+        Tile images are shared with other maps, so they are counted by TILESETS
+        rather than here.
+        """
+        return self.renderer.get_memory_usage()
+
+    def release_assets(self):
+        """Release the map's references to its shared tilesets."""
+        TILESETS.release(self)
+
+    def make_visibility_index(self) -> dict[str, SpatialHash]:
+        """Index the map's drawable items by location, one index per draw group."""
+        visibility = {}
+        for group in ('tiles', 'animated', 'portals', 'obstacles'):
+            visibility[group] = SpatialHash()
+            for item in self.items[group]:
+                visibility[group].insert(item)
+        return visibility
 
     def update(self):
-        for tile in self.items['tiles']:
-            tile.update()
+        self.pathfinding.update()
+        for group in self.tile_groups:
+            group.update()
         for item in self.items['animated']:
             item.update()
 
-    def render(self, surface):
-        """Create the image for the map"""
-        for layer in self.tmxdata.visible_layers:
-            if isinstance(layer, pytmx.TiledTileLayer): # If a tile layer, not an object layer
-                for x, y, gid in layer:
-                    is_animated = False
-                    map_x = x * self.tmxdata.tilewidth # x location of tile adjusted to map size
-                    map_y = y * self.tmxdata.tileheight # y location of tile adjusted to map size
-                    if (properties := self.tmxdata.get_tile_properties_by_gid(gid)):
-                        if "frames" in properties: # Check if tile is animated
-                            if (is_animated := len(properties["frames"]) > 0):
-                                rect = pg.Rect(
-                                    map_x,
-                                    map_y,
-                                    properties['width'],
-                                    properties['height']
-                                )
-                                frames = self.load_animation_frames(properties["frames"])
-                                self.items['tiles'].append(AnimatedTile(frames, rect))
-                    image = self.tmxdata.get_tile_image_by_gid(gid)
-                    if image and not is_animated:
-                        surface.blit(image, (map_x, map_y))
-
-    def make_map(self):
-        """Creates a PyGame surface that can be Blit to the screen"""
-        temp_surface = pg.Surface((self.width, self.height))
-        self.render(temp_surface)
-        return temp_surface
+    def load_animated_tiles(self):
+        """Create an AnimatedTile for every animated cell in the map's tile layers."""
+        self.tile_groups = [AnimatedTileGroup(frames) for frames in self.data.tile_groups]
+        for index, rect in self.data.tiles:
+            self.items['tiles'].append(self.tile_groups[index].add_tile(pg.Rect(rect)))
 
     def get_obstacles(self):
-        """Get a list of static obstacles in the map."""
-        obstacles = []
-        layer = self.tmxdata.get_layer_by_name("Obstacles")
-        if layer:
-            for tile_object in layer:
-                rect = pg.Rect(tile_object.x, tile_object.y, tile_object.width, tile_object.height)
-                if "frames" in tile_object.properties:
-                    if len(tile_object.properties["frames"]) > 0:
-                        item = self.create_animated_object(tile_object)
-                elif tile_object.name == "wall":
-                    item = Obstacle(rect)
-                else:
-                    #item = Obstacle(rect)
-                    pass
-                obstacles.append(item)
-        return obstacles
+        """Get a list of static obstacles in the map.
+
+        Wall rects are merged into as few rects as possible, while animated and
+        interactive obstacles are kept as they are. The number of walls before and
+        after merging is stored in `obstacle_stats`.
+        """
+        obstacles = [self.create_animated_object(obj) for obj in self.data.animated]
+        self.obstacle_stats = {"walls" : self.data.wall_count, "merged" : len(self.data.walls)}
+        return [Obstacle(pg.Rect(rect)) for rect in self.data.walls] + obstacles
 
     def get_portals(self) -> list[Portal]:
         portals = []
-        layer = self.tmxdata.get_layer_by_name("Portals")
-        if layer:
-            for portal in layer:
-                rect = pg.Rect(portal.x, portal.y, portal.width, portal.height)
-                # Get Portal type
-                p_type = None
-                if "type" in portal.properties:
-                    p_type = portal.properties["type"] # When coming from tileset
-                if not p_type:
-                    p_type = portal.type # When coming as shape
-                # Create Portal based on it's type
-                if p_type == "Door":
-                    p = Door(
-                        rect = rect,
-                        name = portal.name,
-                        properties = portal.properties,
-                        frames = self.load_animation_frames(portal.properties['frames'])
-                    )
-                elif p_type == "Portal":
-                    p = Portal(
-                        rect = rect,
-                        name = portal.name,
-                        properties = portal.properties,
-                        img = self.tmxdata.get_tile_image_by_gid(portal.gid)
-                    )
-                else:
-                    raise ValueError(f"Type not recognized for object {portal} in Portals layer.")
-                portals.append(p)
+        for portal in self.data.portals:
+            # Create Portal based on it's type
+            if portal.kind == "Door":
+                p = Door(
+                    rect = pg.Rect(portal.rect),
+                    name = portal.name,
+                    properties = portal.properties,
+                    frames = portal.frames
+                )
+            else:
+                p = Portal(
+                    rect = pg.Rect(portal.rect),
+                    name = portal.name,
+                    properties = portal.properties,
+                    img = portal.image
+                )
+            portals.append(p)
         return portals
 
-    def load_animation_frames(self, frames) -> list:
-        """Create the pygame surface from the AnimationFrame objects passed in the init function.
-        
-        Returns: A list of tuples (image: pg.Surface, duration: int)
-        """
-        loaded_frames = []
-        for frame in frames:
-            gid = frame.gid
-            image = self.tmxdata.get_tile_image_by_gid(gid)
-            duration = frame.duration
-            loaded_frames.append((image, duration))
-        return loaded_frames
-
-    def create_animated_object(self, tile_object) -> AnimatedObstacle:
+    def get_portal_by_pid(self, pid) -> Portal:
+        """Get the portal with a given pid, or None if there isn't one."""
+        for portal in self.items['portals']:
+            if portal.pid == pid:
+                return portal
+        return None
+
+    def create_animated_object(self, obj) -> AnimatedObstacle:
         """Creates animated objects from the map and stores them in the map data to be updated later."""
-        rect = pg.Rect(tile_object.x, tile_object.y, tile_object.width, tile_object.height)
-        if tile_object.name == "MagicTree":
+        rect = pg.Rect(obj.rect)
+        if obj.name == "MagicTree":
             item = MagicTree(
-                    frames = self.load_animation_frames(tile_object.properties['frames']),
+                    frames = obj.frames,
                     rect = rect
                 )
         else:
             item = AnimatedObstacle(
-                frames = self.load_animation_frames(tile_object.properties['frames']),
+                frames = obj.frames,
                 rect = rect
             )
         self.items['animated'].append(item)
@@ -0,0 +1,287 @@
+"""
+Map Cache Module
+
+This module defines the `MapCache` class, which keeps recently visited maps in
+memory so walking back through a portal does not reload and re-render the map.
+Maps are keyed by name and the modification time of their TMX file, so editing
+a map on disk is picked up the next time it is opened.
+
+Maps can also be prefetched through the asset loader while the player is still
+walking towards a portal, together with every sprite sheet the NPCs that live
+there are drawn from, so the map is ready by the time the portal's fade out has finished. A
+worker thread reads the map's pixels and rects, and the game thread converts its
+images, builds the map and pre-renders the area the player arrives in.
+"""
+
+from collections import OrderedDict
+from concurrent.futures import Future
+import pygame as pg
+from config.directories import MAP_DIR, DATA_DIR, SPRITES_DIR
+from config.cache_settings import MAP_CACHE_BUDGET
+from config.game_settings import SCREEN_WIDTH, SCREEN_HEIGHT
+from entities.characters import get_sprite_layers
+from entities.inventory import CharacterInventory
+from maps.map import TiledMap
+from maps.map_data import MapData
+from maps.tilesets import TILESETS
+from utils.asset_store import ASSETS
+from utils.asset_loader import ASSET_LOADER
+from utils.asset_management import get_sheet_data
+from utils.sprite_baking import find_baked_sheet
+from utils.surface_cache import SURFACES, convert_surface
+
+def read_map(map_name: str) -> MapData:
+    """Load a map's data without converting its images, so it can run on a worker thread."""
+    return MapData.load(map_name, convert=False)
+
+def build_map(
+        map_name: str,
+        data: MapData,
+        spawn_pid: int = None,
+        view_size: tuple = None
+) -> TiledMap:
+    """Build a map read by `read_map` and pre-render the area around the portal
+    the player will arrive at. Must be called on the game thread.
+
+    Args:
+        map_name (str): The name of the Tiled map.
+        data (MapData): The map's unconverted data.
+        spawn_pid (int, optional): The pid of the portal the player will spawn at.
+        view_size (tuple, optional): Size of the screen, used to know how much
+            of the map to pre-render.
+
+    Returns:
+        TiledMap: The loaded map.
+    """
+    data.convert_surfaces()
+    tile_map = TiledMap(map_name, data)
+    if spawn_pid is not None:
+        if view_size is None:
+            view_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+        portal = tile_map.get_portal_by_pid(spawn_pid)
+        if portal is not None:
+            area = pg.Rect((0, 0), view_size)
+            area.center = portal.rect.center
+            tile_map.renderer.prerender(area)
+    return tile_map
+
+def get_npc_sheets(data: dict) -> list:
+    """Get the sprite sheets an NPC will load when it is created.
+
+    That is its baked sheet if its layers have already been baked, or else every
+    layer's sheet, which are then baked from on the game thread.
+    """
+    layers = get_sprite_layers(data, CharacterInventory.from_json(data["inventory"]))
+    sheets = [layers[0]] # The entity's own sheet, before it picks its animation set
+    if len(layers) > 1 and (baked := find_baked_sheet(layers)) is not None:
+        sheets.append(baked)
+    else:
+        sheets += layers
+    return list(dict.fromkeys(path.with_suffix(".png") for path in sheets))
+
+def load_map_sprites(map_name: str) -> dict:
+    """Decode every sprite sheet the NPCs that live on a map are drawn from.
+
+    The sheets' metadata is parsed into the sprite metadata cache as well.
+
+    Returns:
+        dict: Decoded sprite sheets by path.
+    """
+    npc_data = ASSETS.load_json(DATA_DIR / "npc_data.json")
+    sheets = {}
+    for name, data in npc_data["npcs"].items():
+        if data["location"]["map"] != map_name:
+            continue
+        try:
+            paths = get_npc_sheets(data)
+        except (OSError, KeyError) as e:
+            print(f"Could not find the sprite sheets of NPC {name}: {e}")
+            continue
+        for path in paths:
+            if path in sheets:
+                continue
+            try:
+                get_sheet_data(path)
+                sheets[path] = ASSETS.load_image(path)
+            except (OSError, KeyError) as e:
+                print(f"Could not preload sprite sheet {path}: {e}")
+    return sheets
+
+def add_map_sprites(sheets: dict) -> dict:
+    """Convert preloaded sprite sheets and add them to the surface cache."""
+    return {path: SURFACES.add(path, convert_surface(image)) for path, image in sheets.items()}
+
+class MapCache:
+    """
+    MapCache Class
+
+    Least recently used cache of loaded TiledMap objects.
+
+    Args:
+        budget (int): Estimated bytes of map data to keep in memory. The most
+            recently opened map is always kept, even if it alone is over budget.
+
+    Attributes:
+        hits (int): Number of maps served from the cache.
+        misses (int): Number of maps that had to be loaded from disk.
+        prefetch_hits (int): Number of maps served from a prefetch.
+    """
+    def __init__(self, budget: int = MAP_CACHE_BUDGET):
+        self.budget = budget
+        self.maps = OrderedDict() # map name -> (mtime, TiledMap)
+        self.pending = {} # map name -> (mtime, load_batch futures) for maps being prefetched
+        self.hits = 0
+        self.misses = 0
+        self.prefetch_hits = 0
+
+    def get(self, map_name: str) -> TiledMap:
+        """Get a map, loading it if it isn't cached or its TMX file has changed.
+
+        Args:
+            map_name (str): The name of the Tiled map.
+
+        Returns:
+            TiledMap: The loaded map.
+        """
+        mtime = self.get_mtime(map_name)
+        entry = self.maps.get(map_name)
+        if entry is not None and entry[0] == mtime:
+            self.hits += 1
+            self.maps.move_to_end(map_name)
+            return entry[1]
+        if (tile_map := self.take_prefetched(map_name, mtime)) is not None:
+            self.prefetch_hits += 1
+            return self.add(map_name, tile_map, mtime)
+        self.misses += 1
+        return self.add(map_name, TiledMap(map_name), mtime)
+
+    def is_cached(self, map_name: str, mtime: int = None) -> bool:
+        """Whether an up to date copy of a map is in the cache."""
+        if mtime is None:
+            mtime = self.get_mtime(map_name)
+        entry = self.maps.get(map_name)
+        return entry is not None and entry[0] == mtime
+
+    def prefetch(self, map_name: str, spawn_pid: int = None, view_size: tuple = None):
+        """Start loading a map on a worker thread.
+
+        Does nothing if the map is already cached or being prefetched.
+
+        Args:
+            map_name (str): The name of the Tiled map.
+            spawn_pid (int, optional): The pid of the portal the player will spawn at.
+            view_size (tuple, optional): Size of the screen.
+        """
+        mtime = self.get_mtime(map_name)
+        if self.is_cached(map_name, mtime):
+            return
+        if map_name in self.pending and self.pending[map_name][0] == mtime:
+            return
+        self.pending[map_name] = (mtime, self.load_batch(map_name, spawn_pid, view_size, mtime))
+
+    def load_batch(
+            self,
+            map_name: str,
+            spawn_pid: int = None,
+            view_size: tuple = None,
+            mtime: int = None
+    ) -> dict[str, Future]:
+        """Start loading everything a map needs through the asset loader.
+
+        Args:
+            map_name (str): The name of the Tiled map.
+            spawn_pid (int, optional): The pid of the portal the player will spawn at.
+            view_size (tuple, optional): Size of the screen.
+            mtime (int, optional): Modification time of the map's TMX file.
+
+        Returns:
+            dict[str, Future]: The loads in the batch: "map" resolves with the
+            TiledMap and "sprites" with the NPCs' sprite sheets by path.
+        """
+        if mtime is None:
+            mtime = self.get_mtime(map_name)
+        return {
+            "map" : ASSET_LOADER.submit(
+                ("map", map_name, mtime), read_map, map_name,
+                finalize=lambda data: build_map(map_name, data, spawn_pid, view_size)
+            ),
+            "sprites" : ASSET_LOADER.submit(
+                ("map_sprites", map_name), load_map_sprites, map_name,
+                finalize=add_map_sprites
+            )
+        }
+
+    def take_prefetched(self, map_name: str, mtime: int) -> TiledMap:
+        """Get a prefetched map.
+
+        A map that is still loading is waited for, since it's already part way
+        done, together with its NPCs' sprite sheets. A prefetch that hasn't
+        started yet is cancelled.
+
+        Returns:
+            TiledMap: The prefetched map, or None if it should be loaded synchronously.
+        """
+        pending = self.pending.pop(map_name, None)
+        if pending is None:
+            return None
+        pending_mtime, batch = pending
+        if pending_mtime != mtime or ASSET_LOADER.cancel(batch["map"]):
+            ASSET_LOADER.cancel(batch["sprites"])
+            return None
+        try:
+            ASSET_LOADER.wait(batch["sprites"])
+            return ASSET_LOADER.wait(batch["map"])
+        except Exception as e: # pylint: disable=broad-exception-caught
+            print(f"Failed to prefetch map {map_name}: {e}")
+            return None
+
+    def add(self, map_name: str, tile_map: TiledMap, mtime: int = None) -> TiledMap:
+        """Store a loaded map as the most recently used and evict maps over budget."""
+        if mtime is None:
+            mtime = self.get_mtime(map_name)
+        if map_name in self.maps and self.maps[map_name][1] is not tile_map:
+            self.maps[map_name][1].release_assets()
+        self.maps[map_name] = (mtime, tile_map)
+        self.maps.move_to_end(map_name)
+        self.evict()
+        return tile_map
+
+    def get_mtime(self, map_name: str) -> int:
+        """Modification time of a map's TMX file."""
+        return ASSETS.get_mtime(MAP_DIR / f"{map_name}.tmx")
+
+    def evict(self):
+        """Drop least recently used maps until the cache fits in its budget."""
+        while len(self.maps) > 1 and self.get_memory_usage() > self.budget:
+            _, (_, tile_map) = self.maps.popitem(last=False)
+            tile_map.release_assets()
+        TILESETS.release_unused()
+
+    def invalidate(self, map_name: str = None):
+        """Drop a cached map, or every cached map if no name is given."""
+        if map_name is None:
+            for _, tile_map in self.maps.values():
+                tile_map.release_assets()
+            self.maps.clear()
+            self.pending.clear()
+        else:
+            if map_name in self.maps:
+                self.maps.pop(map_name)[1].release_assets()
+            self.pending.pop(map_name, None)
+        TILESETS.release_unused()
+
+    def get_memory_usage(self) -> int:
+        """Estimated bytes held by the cached maps."""
+        return sum(tile_map.get_memory_usage() for _, tile_map in self.maps.values())
+
+    def get_stats(self) -> dict:
+        """Retrieve the hit/miss counters and current memory usage."""
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "prefetch_hits" : self.prefetch_hits,
+            "maps" : list(self.maps),
+            "bytes" : self.get_memory_usage()
+        }
+
+MAP_CACHE = MapCache()
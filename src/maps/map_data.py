@@ -0,0 +1,578 @@
+"""
+Map Data Module
+
+This module defines the `MapData` class, the processed contents of a Tiled map:
+its size, merged walls, animated obstacles, portals and animated tiles, with every
+image already loaded. `TiledMap` builds its objects from a MapData rather than
+from pytmx directly, so a map can come either from its TMX file or from the
+compiled cache stored next to it.
+
+A compiled cache (`<map>.mapcache`) holds the pre-rendered static layers and
+every frame image as raw pixel buffers, after a JSON header describing the rest
+of the map. It is keyed by a hash of the TMX file and every tileset it uses, and
+is read through a memory map, so opening a compiled map is mostly a single read.
+The header also records the size and modification time of each of those files,
+so their contents are only read and hashed again when one of them has changed.
+Maps are compiled the first time they are opened, or ahead of time by running
+`python -m maps.map_data` from the src directory.
+
+A map can be loaded without converting any of its images, which is how the asset
+loader reads maps on a worker thread. The game thread then converts them with
+`convert_surfaces` before the map is used.
+"""
+
+from dataclasses import dataclass, field
+import hashlib
+import json
+import math
+import mmap
+import os
+from pathlib import Path
+import struct
+import xml.etree.ElementTree as ET
+import pygame as pg
+import pytmx
+from config.directories import MAP_DIR
+from maps.geometry import merge_rects
+from maps.tilesets import TILESETS
+from utils.asset_store import ASSETS
+from utils.surface_cache import convert_surface
+
+CACHE_SUFFIX = ".mapcache"
+CACHE_MAGIC = b"WCMAP"
+CACHE_VERSION = 2
+# Magic, version and header length, followed by the header and the pixel data
+CACHE_PREFIX = struct.Struct("<5sBI")
+
+_digests = {} # (path, mtime) for the TMX and every tileset file -> content hash
+_map_files = {} # TMX path -> ((path, mtime) of the TMX and its TSX files, dependencies)
+
+def get_map_files(tmx_path: Path) -> list[Path]:
+    """Get a TMX file and every tileset and image file it depends on.
+
+    The list is kept until the TMX or one of its external tilesets changes, so
+    checking whether a map's compiled cache is fresh doesn't parse any XML.
+    """
+    cached = _map_files.get(tmx_path)
+    if cached is not None:
+        sources, files = cached
+        if all(ASSETS.get_mtime(path) == mtime for path, mtime in sources):
+            return list(files)
+    sources = [(tmx_path, ASSETS.get_mtime(tmx_path))]
+    files = [tmx_path]
+    root = read_tmx(tmx_path)
+    for tileset in root.iter("tileset"):
+        source = tileset.get("tsx")
+        if source:
+            files.append(tmx_path.parent / source)
+            sources.append((files[-1], ASSETS.get_mtime(files[-1])))
+    for image in root.iter("image"):
+        files.append(tmx_path.parent / image.get("source"))
+    _map_files[tmx_path] = (tuple(sources), tuple(files))
+    return files
+
+def read_tmx(tmx_path: Path) -> ET.Element:
+    """Parse a TMX file, with the contents of its external tilesets inlined.
+
+    pytmx opens external tilesets from disk itself, so they are read here through
+    ASSETS instead. Image paths in a tileset are relative to the tileset, and are
+    rewritten to be relative to the map, like pytmx does. The tileset's source is
+    kept in a "tsx" attribute.
+    """
+    root = ET.fromstring(bytes(ASSETS.get_bytes(tmx_path)))
+    for tileset in root.findall("tileset"):
+        source = tileset.get("source")
+        if not source:
+            continue
+        tsx = ET.fromstring(bytes(ASSETS.get_bytes(tmx_path.parent / source)))
+        for image in tsx.iter("image"):
+            image.set("source", os.path.join(os.path.dirname(source), image.get("source")))
+        tsx.set("firstgid", tileset.get("firstgid"))
+        tsx.set("tsx", source)
+        index = list(root).index(tileset)
+        root.remove(tileset)
+        root.insert(index, tsx)
+    return root
+
+def get_map_digest(tmx_path: Path) -> str:
+    """Hash the contents of a TMX file and every tileset it uses.
+
+    Args:
+        tmx_path (Path): Path to the TMX file.
+
+    Returns:
+        str: A hex digest identifying this exact version of the map.
+    """
+    files = get_map_files(tmx_path)
+    key = tuple((path, ASSETS.get_mtime(path)) for path in files)
+    if key not in _digests:
+        digest = hashlib.sha1(str(CACHE_VERSION).encode())
+        for path in files:
+            digest.update(ASSETS.get_bytes(path))
+        _digests[key] = digest.hexdigest()
+    return _digests[key]
+
+def get_map_stats(tmx_path: Path) -> list:
+    """Get the size and modification time of a TMX file and every file it depends on.
+
+    Returns:
+        list: [path relative to the TMX's folder, size, mtime] for each file.
+    """
+    return [
+        [(path.relative_to(tmx_path.parent)).as_posix(), *ASSETS.get_stat(path)]
+        for path in get_map_files(tmx_path)
+    ]
+
+def is_cache_current(header: dict, tmx_path: Path) -> bool:
+    """Whether the files a compiled map was made from still have the size and
+    modification time they had, so the cache is fresh without reading them."""
+    try:
+        return all(
+            ASSETS.get_stat(tmx_path.parent / path) == (size, mtime)
+            for path, size, mtime in header["files"]
+        )
+    except OSError:
+        return False
+
+def write_cache(path: Path, header: dict, blobs: list) -> bool:
+    """Write a compiled cache file from its header and pixel data.
+
+    Returns:
+        bool: Whether the cache was written.
+    """
+    header_bytes = json.dumps(header).encode()
+    temp_path = path.with_name(path.name + ".tmp")
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(CACHE_PREFIX.pack(CACHE_MAGIC, CACHE_VERSION, len(header_bytes)))
+            file.write(header_bytes)
+            for blob in blobs:
+                file.write(blob)
+        temp_path.replace(path)
+    except OSError as e:
+        print(f"Could not write map cache {path}: {e}")
+        return False
+    return True
+
+@dataclass
+class MapObject:
+    """An object from one of the map's object layers.
+
+    Attributes:
+        kind (str): The object's type, e.g. "Door" or "Portal".
+        name (str): The object's name in Tiled.
+        rect (pg.Rect): Area of the map the object covers.
+        properties (dict): The object's custom properties.
+        frames (list): (image: pg.Surface, duration: int) tuples of its animation.
+        image (pg.Surface): The object's tile image, if it has one.
+    """
+    kind: str
+    name: str
+    rect: pg.Rect
+    properties: dict = field(default_factory=dict)
+    frames: list = field(default_factory=list)
+    image: pg.Surface = None
+
+class MapData:
+    """
+    MapData Class
+
+    The processed contents of a Tiled map.
+
+    Attributes:
+        width (int): The width of the map in tiles.
+        height (int): The height of the map in tiles.
+        tilewidth (int): The width of a tile in pixels.
+        tileheight (int): The height of a tile in pixels.
+        overhang (tuple[int, int]): How many tiles the largest tiles spill over
+            to the right and below their cell.
+        tmxdata (pytmx.TiledMap): The parsed TMX file, or None if the map was
+            loaded from its compiled cache.
+        static (pg.Surface): The pre-rendered static layers, or None if the map
+            was loaded from its TMX file.
+        animated_gids (set[int]): Gids of tiles that are animated rather than drawn statically.
+        walls (list[pg.Rect]): The map's wall rects, merged.
+        wall_count (int): Number of wall rects in the map before merging.
+        animated (list[MapObject]): Animated obstacles.
+        portals (list[MapObject]): Doors and portals.
+        tile_groups (list[list]): Frames of each animated tile sequence, as
+            (image: pg.Surface, duration: int) tuples.
+        tiles (list[tuple[int, pg.Rect]]): Group index and area of every animated
+            tile, in drawing order.
+    """
+    def __init__(self, width: int, height: int, tilewidth: int, tileheight: int):
+        self.width = width
+        self.height = height
+        self.tilewidth = tilewidth
+        self.tileheight = tileheight
+        self.overhang = (0, 0)
+        self.tmxdata = None
+        self.static = None
+        self.animated_gids = set()
+        self.walls = []
+        self.wall_count = 0
+        self.animated = []
+        self.portals = []
+        self.tile_groups = []
+        self.tiles = []
+
+    @classmethod
+    def load(cls, map_name: str, owner = None, convert: bool = True):
+        """Load a map from its compiled cache, compiling it first if the cache is stale.
+
+        Args:
+            map_name (str): The name of the Tiled map.
+            owner (optional): The object that keeps the map's tilesets in use
+                if it has to be loaded from its TMX file.
+            convert (bool): Whether images are converted to the display's format.
+                Pass False to load the map off the game thread.
+
+        Returns:
+            MapData: The map's data.
+        """
+        tmx_path = MAP_DIR / f"{map_name}.tmx"
+        cache_path = tmx_path.with_suffix(CACHE_SUFFIX)
+        data = cls.from_cache(cache_path, tmx_path, convert)
+        if data is None:
+            # Taken before reading the files, so an edit made meanwhile isn't missed
+            stats = get_map_stats(tmx_path)
+            digest = get_map_digest(tmx_path)
+            data = cls.from_tmx(tmx_path, owner, convert)
+            if data.save(cache_path, digest, stats) and not convert:
+                # Read it back so the static layer is a single image, not tiles still to convert
+                data = cls.from_cache(cache_path, convert=convert) or data
+        return data
+
+    @classmethod
+    def from_tmx(cls, tmx_path: Path, owner = None, convert: bool = True):
+        """Parse a TMX file and load the images it uses."""
+        # Tilesets are shared with every other loaded map through TILESETS
+        tm = pytmx.TiledMap(image_loader = TILESETS.get_loader(owner, convert))
+        tm.filename = str(tmx_path)
+        tm.parse_xml(read_tmx(tmx_path))
+        data = cls(tm.width, tm.height, tm.tilewidth, tm.tileheight)
+        data.tmxdata = tm
+        # Tiles larger than the grid spill into the next cells to the right and below
+        max_w = max((ts.tilewidth for ts in tm.tilesets), default=tm.tilewidth)
+        max_h = max((ts.tileheight for ts in tm.tilesets), default=tm.tileheight)
+        data.overhang = (
+            math.ceil(max(0, max_w - tm.tilewidth) / tm.tilewidth),
+            math.ceil(max(0, max_h - tm.tileheight) / tm.tileheight)
+        )
+        data.animated_gids = data.get_animated_gids()
+        data.load_obstacles()
+        data.load_portals()
+        data.load_animated_tiles()
+        return data
+
+    def get_animated_gids(self) -> set[int]:
+        """Get the gids of every animated tile in the map's tilesets."""
+        animated = set()
+        for gid, properties in self.tmxdata.tile_properties.items():
+            if len(properties.get("frames", [])) > 0:
+                animated.add(gid)
+        return animated
+
+    def load_animation_frames(self, frames) -> list:
+        """Create the pygame surface from the AnimationFrame objects of a tile.
+
+        Returns: A list of tuples (image: pg.Surface, duration: int)
+        """
+        loaded_frames = []
+        for frame in frames:
+            image = self.tmxdata.get_tile_image_by_gid(frame.gid)
+            loaded_frames.append((image, frame.duration))
+        return loaded_frames
+
+    def load_obstacles(self):
+        """Load the walls and animated obstacles in the map's Obstacles layer."""
+        walls = []
+        layer = self.tmxdata.get_layer_by_name("Obstacles")
+        if layer:
+            for tile_object in layer:
+                rect = pg.Rect(tile_object.x, tile_object.y, tile_object.width, tile_object.height)
+                if "frames" in tile_object.properties:
+                    if len(tile_object.properties["frames"]) > 0:
+                        self.animated.append(MapObject(
+                            kind = "animated",
+                            name = tile_object.name,
+                            rect = rect,
+                            frames = self.load_animation_frames(tile_object.properties["frames"])
+                        ))
+                elif tile_object.name == "wall":
+                    walls.append(rect)
+        self.walls = merge_rects(walls)
+        self.wall_count = len(walls)
+
+    def load_portals(self):
+        """Load the doors and portals in the map's Portals layer."""
+        layer = self.tmxdata.get_layer_by_name("Portals")
+        if layer:
+            for portal in layer:
+                # Get Portal type
+                p_type = None
+                if "type" in portal.properties:
+                    p_type = portal.properties["type"] # When coming from tileset
+                if not p_type:
+                    p_type = portal.type # When coming as shape
+                obj = MapObject(
+                    kind = p_type,
+                    name = portal.name,
+                    rect = pg.Rect(portal.x, portal.y, portal.width, portal.height),
+                    properties = {
+                        key: value for key, value in portal.properties.items()
+                        if isinstance(value, (str, int, float, bool))
+                    }
+                )
+                if p_type == "Door":
+                    obj.frames = self.load_animation_frames(portal.properties["frames"])
+                elif p_type == "Portal":
+                    obj.image = self.tmxdata.get_tile_image_by_gid(portal.gid)
+                else:
+                    raise ValueError(f"Type not recognized for object {portal} in Portals layer.")
+                self.portals.append(obj)
+
+    def load_animated_tiles(self):
+        """Find every animated cell in the map's tile layers, grouped by animation."""
+        groups = {} # (gid, duration) of every frame -> group index
+        for layer in self.tmxdata.visible_layers:
+            if isinstance(layer, pytmx.TiledTileLayer): # If a tile layer, not an object layer
+                for x, y, gid in layer:
+                    if gid in self.animated_gids:
+                        properties = self.tmxdata.get_tile_properties_by_gid(gid)
+                        key = tuple((frame.gid, frame.duration) for frame in properties["frames"])
+                        if key not in groups:
+                            groups[key] = len(self.tile_groups)
+                            self.tile_groups.append(self.load_animation_frames(properties["frames"]))
+                        rect = pg.Rect(
+                            x * self.tilewidth, # x location of tile adjusted to map size
+                            y * self.tileheight, # y location of tile adjusted to map size
+                            properties['width'],
+                            properties['height']
+                        )
+                        self.tiles.append((groups[key], rect))
+
+    def render_area(self, rect: pg.Rect) -> pg.Surface:
+        """Create the image of the static (non-animated) tiles in an area of the map."""
+        surface = pg.Surface(rect.size)
+        if self.static is not None:
+            surface.blit(self.static, (0, 0), rect)
+            return surface
+        tmxdata = self.tmxdata
+        first_x = rect.left // self.tilewidth - self.overhang[0]
+        first_y = rect.top // self.tileheight - self.overhang[1]
+        last_x = min(self.width, math.ceil(rect.right / self.tilewidth))
+        last_y = min(self.height, math.ceil(rect.bottom / self.tileheight))
+        for layer in tmxdata.visible_layers:
+            if isinstance(layer, pytmx.TiledTileLayer): # If a tile layer, not an object layer
+                for y in range(max(0, first_y), last_y):
+                    layer_row = layer.data[y]
+                    for x in range(max(0, first_x), last_x):
+                        gid = layer_row[x]
+                        if not gid or gid in self.animated_gids:
+                            continue
+                        image = tmxdata.get_tile_image_by_gid(gid)
+                        if image:
+                            surface.blit(image, (
+                                x * self.tilewidth - rect.x,
+                                y * self.tileheight - rect.y
+                            ))
+        return surface
+
+    def save(self, path: Path, digest: str, stats: list = None) -> bool:
+        """Write the map to a compiled cache file.
+
+        Args:
+            path (Path): Where to write the cache.
+            digest (str): Hash of the TMX and tilesets the map was loaded from.
+            stats (list, optional): Size and modification time of those files,
+                from `get_map_stats`.
+
+        Returns:
+            bool: Whether the cache was written.
+        """
+        blobs = []
+        offset = 0
+        images = {} # id(surface) -> index in the header's image table
+
+        def add_blob(data: bytes) -> int:
+            nonlocal offset
+            blobs.append(data)
+            start = offset
+            offset += len(data)
+            return start
+
+        def add_image(image: pg.Surface) -> int:
+            if image is None:
+                return None
+            if id(image) not in images:
+                images[id(image)] = len(header["images"])
+                # Keep the format pytmx converted the tile to, alpha or colorkey
+                fmt = "RGBA" if image.get_flags() & pg.SRCALPHA else "RGB"
+                colorkey = image.get_colorkey()
+                header["images"].append({
+                    "offset" : add_blob(pg.image.tobytes(image, fmt)),
+                    "size" : image.get_size(),
+                    "format" : fmt,
+                    "colorkey" : list(colorkey) if colorkey else None
+                })
+            return images[id(image)]
+
+        def add_frames(frames: list) -> list:
+            return [[add_image(image), duration] for image, duration in frames]
+
+        static = self.render_area(pg.Rect(
+            0, 0, self.width * self.tilewidth, self.height * self.tileheight
+        ))
+        header = {
+            "digest" : digest,
+            "files" : stats or [],
+            "size" : [self.width, self.height],
+            "tile_size" : [self.tilewidth, self.tileheight],
+            "overhang" : list(self.overhang),
+            "static" : add_blob(pg.image.tobytes(static, "RGB")),
+            "images" : [],
+            "walls" : [list(rect) for rect in self.walls],
+            "wall_count" : self.wall_count
+        }
+        header["animated"] = [
+            {"name" : obj.name, "rect" : list(obj.rect), "frames" : add_frames(obj.frames)}
+            for obj in self.animated
+        ]
+        header["portals"] = [
+            {
+                "kind" : obj.kind,
+                "name" : obj.name,
+                "rect" : list(obj.rect),
+                "properties" : obj.properties,
+                "frames" : add_frames(obj.frames),
+                "image" : add_image(obj.image)
+            }
+            for obj in self.portals
+        ]
+        header["tile_groups"] = [add_frames(frames) for frames in self.tile_groups]
+        header["tiles"] = [[index, list(rect)] for index, rect in self.tiles]
+        return write_cache(path, header, blobs)
+
+    @classmethod
+    def from_cache(cls, path: Path, tmx_path: Path = None, convert: bool = True):
+        """Load a map from a compiled cache file.
+
+        Args:
+            path (Path): The cache file.
+            tmx_path (Path, optional): The map the cache must be up to date with.
+            convert (bool): Whether images are converted to the display's format.
+
+        Returns:
+            MapData: The map's data, or None if there is no cache or it is stale.
+        """
+        try:
+            with open(path, "rb") as file:
+                # Private pages, so surfaces made from the buffer never write to the file
+                buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+        except (OSError, ValueError):
+            return None
+        if len(buffer) < CACHE_PREFIX.size:
+            return None
+        magic, version, header_len = CACHE_PREFIX.unpack_from(buffer)
+        if magic != CACHE_MAGIC or version != CACHE_VERSION:
+            return None
+        header_end = CACHE_PREFIX.size + header_len
+        header = json.loads(bytes(buffer[CACHE_PREFIX.size:header_end]))
+        view = memoryview(buffer)[header_end:]
+        if tmx_path is not None and not is_cache_current(header, tmx_path):
+            # Only hash the map's files if they look changed
+            if header["digest"] != get_map_digest(tmx_path):
+                return None
+            # Touched but not edited, record the new times so they aren't hashed again
+            header["files"] = get_map_stats(tmx_path)
+            write_cache(path, header, [view])
+
+        data = cls(*header["size"], *header["tile_size"])
+        data.overhang = tuple(header["overhang"])
+        size = (data.width * data.tilewidth, data.height * data.tileheight)
+        start = header["static"]
+        data.static = pg.image.frombuffer(view[start:start + size[0] * size[1] * 3], size, "RGB")
+        images = []
+        for entry in header["images"]:
+            start, (w, h), fmt = entry["offset"], entry["size"], entry["format"]
+            image = pg.image.frombuffer(view[start:start + w * h * len(fmt)], (w, h), fmt)
+            if convert:
+                image = convert_surface(image, entry["colorkey"] or None)
+            elif entry["colorkey"]:
+                image.set_colorkey(entry["colorkey"])
+            images.append(image)
+
+        def get_frames(frames: list) -> list:
+            return [(images[index], duration) for index, duration in frames]
+
+        data.walls = [pg.Rect(rect) for rect in header["walls"]]
+        data.wall_count = header["wall_count"]
+        data.animated = [
+            MapObject(
+                kind = "animated",
+                name = obj["name"],
+                rect = pg.Rect(obj["rect"]),
+                frames = get_frames(obj["frames"])
+            )
+            for obj in header["animated"]
+        ]
+        data.portals = [
+            MapObject(
+                kind = obj["kind"],
+                name = obj["name"],
+                rect = pg.Rect(obj["rect"]),
+                properties = obj["properties"],
+                frames = get_frames(obj["frames"]),
+                image = images[obj["image"]] if obj["image"] is not None else None
+            )
+            for obj in header["portals"]
+        ]
+        data.tile_groups = [get_frames(frames) for frames in header["tile_groups"]]
+        data.tiles = [(index, pg.Rect(rect)) for index, rect in header["tiles"]]
+        return data
+
+    def convert_surfaces(self):
+        """Convert the images of a map loaded with `convert=False` to the display's format.
+
+        Must be called on the game thread. Images shared by several frames stay shared.
+        """
+        converted = {} # id(surface) -> (surface, converted surface)
+
+        def convert(image: pg.Surface) -> pg.Surface:
+            if image is None:
+                return None
+            if id(image) not in converted:
+                # Keep the original alive so its id isn't reused by another surface
+                converted[id(image)] = (image, convert_surface(image))
+            return converted[id(image)][1]
+
+        def convert_frames(frames: list) -> list:
+            return [(convert(image), duration) for image, duration in frames]
+
+        for obj in self.animated + self.portals:
+            obj.frames = convert_frames(obj.frames)
+            obj.image = convert(obj.image)
+        self.tile_groups = [convert_frames(frames) for frames in self.tile_groups]
+
+def compile_maps() -> int:
+    """Compile every map in the map directory whose cache is missing or stale.
+
+    Returns:
+        int: The number of maps compiled.
+    """
+    compiled = 0
+    for tmx_path in sorted(MAP_DIR.glob("*.tmx")):
+        cache_path = tmx_path.with_suffix(CACHE_SUFFIX)
+        if MapData.from_cache(cache_path, tmx_path) is None:
+            stats = get_map_stats(tmx_path)
+            digest = get_map_digest(tmx_path)
+            if MapData.from_tmx(tmx_path).save(cache_path, digest, stats):
+                compiled += 1
+                print(f"Compiled {tmx_path.name} -> {cache_path.name}")
+    return compiled
+
+if __name__ == "__main__":
+    pg.init()
+    pg.display.set_mode((1, 1), pg.HIDDEN)
+    print(f"{compile_maps()} map(s) compiled.")
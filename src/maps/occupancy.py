@@ -0,0 +1,171 @@
+"""
+Occupancy Module
+
+This module defines the `OccupancyGrid` class, a NumPy array with one cell per
+map tile recording what is on that tile. Movement is tile based, so checking a
+single array cell is usually enough to know a step is clear without testing the
+step against any obstacle rects. The grid also doubles as a cost map for
+pathfinding.
+
+Static flags (walls and portals) are built from the map when it loads. Dynamic
+entities are counted separately so they can move without rebuilding the grid.
+"""
+
+import numpy as np
+import pygame as pg
+
+# Tile flags
+FREE = 0
+BLOCKED = 1 # Walls and other obstacles
+PORTAL = 2 # Doors and portals
+
+class OccupancyGrid:
+    """
+    OccupancyGrid Class
+
+    Per-tile occupancy of a map.
+
+    Args:
+        cols (int): Width of the map in tiles.
+        rows (int): Height of the map in tiles.
+        tile_w (int): Width of a tile in pixels.
+        tile_h (int): Height of a tile in pixels.
+
+    Attributes:
+        flags (np.ndarray): uint8 array of tile flags, indexed [row, col].
+        entities (np.ndarray): uint16 array counting the entities on each tile.
+        revision (int): Incremented whenever the static flags change.
+    """
+    def __init__(self, cols: int, rows: int, tile_w: int, tile_h: int):
+        self.cols = cols
+        self.rows = rows
+        self.tile_w = tile_w
+        self.tile_h = tile_h
+        self.flags = np.zeros((rows, cols), dtype=np.uint8)
+        self.entities = np.zeros((rows, cols), dtype=np.uint16)
+        self.entity_tiles = {} # id(entity) -> tile bounds the entity was counted in
+        self.revision = 0
+
+    @classmethod
+    def from_map(cls, tile_map):
+        """Build the grid from a map's obstacles and portals."""
+        data = tile_map.data
+        grid = cls(data.width, data.height, data.tilewidth, data.tileheight)
+        for obstacle in tile_map.items['obstacles']:
+            grid.mark_rect(obstacle.rect, BLOCKED)
+        for portal in tile_map.items['portals']:
+            grid.mark_rect(portal.rect, PORTAL)
+        return grid
+
+    def get_tile_bounds(self, rect: pg.Rect) -> tuple[int, int, int, int]:
+        """Get the (first_col, first_row, end_col, end_row) of the tiles a rect touches.
+
+        The bounds are clipped to the map and the end values are exclusive, so
+        they can be used directly as array slices.
+        """
+        first_col = max(0, rect.left // self.tile_w)
+        first_row = max(0, rect.top // self.tile_h)
+        end_col = min(self.cols, (rect.right - 1) // self.tile_w + 1)
+        end_row = min(self.rows, (rect.bottom - 1) // self.tile_h + 1)
+        return first_col, first_row, end_col, end_row
+
+    def is_in_bounds(self, rect: pg.Rect) -> bool:
+        """Whether a rect lies completely inside the map."""
+        return (
+            rect.left >= 0 and rect.top >= 0
+            and rect.right <= self.cols * self.tile_w
+            and rect.bottom <= self.rows * self.tile_h
+        )
+
+    def mark_rect(self, rect: pg.Rect, flag: int):
+        """Set a flag on every tile a rect touches."""
+        c0, r0, c1, r1 = self.get_tile_bounds(rect)
+        self.flags[r0:r1, c0:c1] |= flag
+        self.revision += 1
+
+    def clear_rect(self, rect: pg.Rect, flag: int):
+        """Remove a flag from every tile a rect touches."""
+        c0, r0, c1, r1 = self.get_tile_bounds(rect)
+        self.flags[r0:r1, c0:c1] &= ~np.uint8(flag)
+        self.revision += 1
+
+    def place_entity(self, entity):
+        """Count an entity on the tiles its rect touches, moving it if already placed."""
+        bounds = self.get_tile_bounds(entity.rect)
+        old_bounds = self.entity_tiles.get(id(entity))
+        if old_bounds == bounds:
+            return
+        if old_bounds is not None:
+            self.remove_entity(entity)
+        c0, r0, c1, r1 = bounds
+        self.entities[r0:r1, c0:c1] += 1
+        self.entity_tiles[id(entity)] = bounds
+
+    def remove_entity(self, entity):
+        """Stop counting an entity."""
+        bounds = self.entity_tiles.pop(id(entity), None)
+        if bounds is not None:
+            c0, r0, c1, r1 = bounds
+            self.entities[r0:r1, c0:c1] -= 1
+
+    def clear_entities(self):
+        """Stop counting every entity."""
+        self.entities.fill(0)
+        self.entity_tiles.clear()
+
+    def get(self, col: int, row: int) -> int:
+        """Get the flags of a tile. Tiles outside the map are blocked."""
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return int(self.flags[row, col])
+        return BLOCKED
+
+    def is_blocked(self, col: int, row: int) -> bool:
+        """Whether a tile has an obstacle on it."""
+        return bool(self.get(col, row) & BLOCKED)
+
+    def has_entity(self, col: int, row: int) -> bool:
+        """Whether an entity is standing on a tile."""
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return bool(self.entities[row, col])
+        return False
+
+    def is_rect_clear(self, rect: pg.Rect) -> bool:
+        """Whether a rect inside the map touches no obstacles, portals or entities.
+
+        A False result only means the rect might collide with something, the
+        exact rects still have to be checked.
+        """
+        if not self.is_in_bounds(rect):
+            return False
+        c0, r0, c1, r1 = self.get_tile_bounds(rect)
+        return not (self.flags[r0:r1, c0:c1].any() or self.entities[r0:r1, c0:c1].any())
+
+    def are_blocked(self, cols, rows) -> np.ndarray:
+        """Check many tiles at once.
+
+        Args:
+            cols (array-like): Column of each tile.
+            rows (array-like): Row of each tile.
+
+        Returns:
+            np.ndarray: A bool array, True where the tile is blocked or outside the map.
+        """
+        cols = np.asarray(cols)
+        rows = np.asarray(rows)
+        inside = (cols >= 0) & (cols < self.cols) & (rows >= 0) & (rows < self.rows)
+        blocked = np.ones(cols.shape, dtype=bool)
+        blocked[inside] = (self.flags[rows[inside], cols[inside]] & BLOCKED) != 0
+        return blocked
+
+    def get_cost_map(self, weights: np.ndarray = None) -> np.ndarray:
+        """Get the cost of entering each tile, for pathfinding.
+
+        Args:
+            weights (np.ndarray, optional): Per-tile cost multipliers, defaults to 1.
+
+        Returns:
+            np.ndarray: float array of costs, np.inf for blocked tiles.
+        """
+        cost = np.ones(self.flags.shape) if weights is None else np.array(weights, dtype=float)
+        cost[(self.flags & BLOCKED) != 0] = np.inf
+        return cost
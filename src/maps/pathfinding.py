@@ -0,0 +1,222 @@
+"""
+Pathfinding Module
+
+This module defines the `PathfindingService` class, which plans routes across a
+map's tile grid with A*. Characters ask the service for a path and get back a
+`PathRequest` that is filled in once the search is done.
+
+Searches are time sliced: `PathfindingService.update` is called once per frame
+and only works for a fixed budget, so many NPCs planning at once can't stall a
+frame. Finished paths are cached by (start, goal, grid revision) and the cache
+is dropped whenever the map's obstacles change.
+"""
+
+from collections import OrderedDict, deque
+import heapq
+import time
+import numpy as np
+from config.game_settings import PATHFINDING_BUDGET_MS, PATH_CACHE_SIZE
+from maps.occupancy import OccupancyGrid, PORTAL
+
+EXPANSIONS_PER_CHECK = 16 # Nodes expanded between checks of the time budget
+
+class PathRequest:
+    """A route asked for by a character.
+
+    Attributes:
+        start (tuple[int, int]): The (col, row) the path starts from.
+        goal (tuple[int, int]): The (col, row) the path leads to.
+        path (list[tuple[int, int]]): Tiles to step through, excluding the start.
+            None until the search is done, or if no path exists.
+        done (bool): Whether the search has finished.
+    """
+    def __init__(self, start: tuple[int, int], goal: tuple[int, int]) -> None:
+        self.start = start
+        self.goal = goal
+        self.path = None
+        self.done = False
+
+    def finish(self, path):
+        """Complete the request with a path, or None if the goal can't be reached."""
+        self.path = list(path) if path is not None else None
+        self.done = True
+
+    def has_failed(self) -> bool:
+        """Whether the search finished without finding a path."""
+        return self.done and self.path is None
+
+class PathfindingService:
+    """
+    PathfindingService Class
+
+    Plans paths across an occupancy grid using A* with a Manhattan heuristic.
+
+    Args:
+        occupancy (OccupancyGrid): The map's occupancy grid.
+        weights (np.ndarray, optional): Per-tile cost multipliers, e.g. to make
+            characters prefer roads.
+        avoid_portals (bool): Whether paths may go through portal tiles.
+        budget_ms (float): Milliseconds of searching allowed per update.
+
+    Attributes:
+        hits (int): Number of requests answered from the cache.
+        misses (int): Number of requests that needed a search.
+    """
+    def __init__(
+            self,
+            occupancy: OccupancyGrid,
+            weights: np.ndarray = None,
+            avoid_portals: bool = True,
+            budget_ms: float = PATHFINDING_BUDGET_MS
+            ) -> None:
+        self.occupancy = occupancy
+        self.weights = weights
+        self.avoid_portals = avoid_portals
+        self.budget_ms = budget_ms
+        self.cache = OrderedDict() # (start, goal, revision) -> path
+        self.pending = {} # (start, goal) -> PathRequest
+        self.queue = deque() # (PathRequest, search generator)
+        self.revision = None
+        self.cost = None
+        self.cost_rows = []
+        self.min_cost = 1.0
+        self.hits = 0
+        self.misses = 0
+        self.refresh()
+
+    def refresh(self):
+        """Rebuild the cost map and drop cached paths if the grid has changed."""
+        if self.revision == self.occupancy.revision:
+            return
+        self.revision = self.occupancy.revision
+        self.cost = self.occupancy.get_cost_map(self.weights)
+        if self.avoid_portals:
+            self.cost[(self.occupancy.flags & PORTAL) != 0] = np.inf
+        # Plain lists index much faster than numpy arrays in the search's inner loop
+        self.cost_rows = self.cost.tolist()
+        # Scale the heuristic by the cheapest tile so it never overestimates
+        finite = self.cost[np.isfinite(self.cost)]
+        self.min_cost = float(finite.min()) if finite.size else 1.0
+        self.cache.clear()
+        # Restart searches that were planning on the old grid
+        requests = [request for request, _ in self.queue]
+        self.queue.clear()
+        for request in requests:
+            self.queue.append((request, self.search(request.start, request.goal)))
+
+    def set_weights(self, weights: np.ndarray):
+        """Change the per-tile cost multipliers."""
+        self.weights = weights
+        self.revision = None
+        self.refresh()
+
+    def request_path(self, start: tuple[int, int], goal: tuple[int, int]) -> PathRequest:
+        """Ask for a path between two tiles.
+
+        Args:
+            start (tuple[int, int]): The (col, row) to start from.
+            goal (tuple[int, int]): The (col, row) to go to.
+
+        Returns:
+            PathRequest: Already done if the path was cached, otherwise
+            completed by a later call to `update`.
+        """
+        self.refresh()
+        start, goal = tuple(start), tuple(goal)
+        key = (start, goal, self.revision)
+        if key in self.cache:
+            self.hits += 1
+            self.cache.move_to_end(key)
+            request = PathRequest(start, goal)
+            request.finish(self.cache[key])
+            return request
+        if (start, goal) in self.pending:
+            return self.pending[(start, goal)]
+        self.misses += 1
+        request = PathRequest(start, goal)
+        self.pending[(start, goal)] = request
+        self.queue.append((request, self.search(start, goal)))
+        return request
+
+    def update(self):
+        """Work on queued searches until this frame's time budget is used up."""
+        self.refresh()
+        deadline = time.perf_counter() + self.budget_ms / 1000
+        while self.queue and time.perf_counter() < deadline:
+            request, search = self.queue[0]
+            try:
+                next(search)
+            except StopIteration as result:
+                self.queue.popleft()
+                self.complete(request, result.value)
+
+    def complete(self, request: PathRequest, path):
+        """Cache a finished path and hand it to the request."""
+        self.pending.pop((request.start, request.goal), None)
+        if path is not None:
+            path = tuple(path)
+        self.cache[(request.start, request.goal, self.revision)] = path
+        while len(self.cache) > PATH_CACHE_SIZE:
+            self.cache.popitem(last=False)
+        request.finish(path)
+
+    def get_cost(self, col: int, row: int) -> float:
+        """Cost of stepping onto a tile, np.inf if it can't be entered."""
+        if 0 <= col < self.occupancy.cols and 0 <= row < self.occupancy.rows:
+            return self.cost_rows[row][col]
+        return np.inf
+
+    def search(self, start: tuple[int, int], goal: tuple[int, int]):
+        """A* search, as a generator that yields every few expansions.
+
+        Returns (through StopIteration):
+            list[tuple[int, int]]: Tiles from the start (excluded) to the goal,
+            or None if the goal can't be reached.
+        """
+        if start == goal:
+            return []
+        if self.get_cost(*goal) == np.inf:
+            return None
+        min_cost = self.min_cost
+
+        def heuristic(tile):
+            return (abs(tile[0] - goal[0]) + abs(tile[1] - goal[1])) * min_cost
+
+        open_heap = [(heuristic(start), 0, start)]
+        came_from = {start: None}
+        g_score = {start: 0.0}
+        counter = 0 # Tie breaker so the heap never compares tiles
+        expansions = 0
+        while open_heap:
+            _, _, tile = heapq.heappop(open_heap)
+            if tile == goal:
+                path = []
+                while tile != start:
+                    path.append(tile)
+                    tile = came_from[tile]
+                path.reverse()
+                return path
+            col, row = tile
+            for neighbor in ((col + 1, row), (col - 1, row), (col, row + 1), (col, row - 1)):
+                step_cost = self.get_cost(*neighbor)
+                if step_cost == np.inf:
+                    continue
+                score = g_score[tile] + step_cost
+                if score < g_score.get(neighbor, np.inf):
+                    g_score[neighbor] = score
+                    came_from[neighbor] = tile
+                    counter += 1
+                    heapq.heappush(open_heap, (score + heuristic(neighbor), counter, neighbor))
+            expansions += 1
+            if expansions % EXPANSIONS_PER_CHECK == 0:
+                yield
+        return None
+
+    def get_stats(self) -> dict:
+        """Retrieve the hit/miss counters and queue length."""
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "queued" : len(self.queue),
+            "cached" : len(self.cache)
+        }
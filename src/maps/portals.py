@@ -45,7 +45,7 @@ class Portal:
         return [Scene("Enter Portal",
             [
                 SceneAction(
-                    action_method=ExecutableMethod(game_state.player, "change_destination", [dx,dy,[]]),
+                    action_method=ExecutableMethod(game_state.player, "change_destination", [dx,dy,None]),
                     condition_method=ExecutableMethod(game_state.player, "has_arrived", [])
                     ),
                 fade_out_action
@@ -124,7 +124,7 @@ class Door(Portal):
             [
                 SceneAction(ExecutableMethod(self, "open_door")),
                 SceneAction(
-                    action_method=ExecutableMethod(game_state.player, "change_destination", [dx,dy,[]]),
+                    action_method=ExecutableMethod(game_state.player, "change_destination", [dx,dy,None]),
                     condition_method=ExecutableMethod(game_state.player, "has_arrived", [])
                     ),
                 fade_in_action
@@ -0,0 +1,139 @@
+"""
+Spatial Module
+
+This module defines the `SpatialHash` class, a uniform grid used to quickly find
+the map objects in an area. Objects are stored in every grid cell their rect
+touches, so a query only has to look at the cells it overlaps instead of every
+object in the map.
+
+Objects can be moved and removed after they are inserted, so the grid works for
+dynamic entities such as NPCs as well as static walls.
+"""
+
+import pygame as pg
+from config.game_settings import SPATIAL_CELL_SIZE
+
+class SpatialHash:
+    """
+    SpatialHash Class
+
+    A uniform grid of cells mapping areas of the map to the objects in them.
+    Any object with a `rect` attribute can be stored.
+
+    Args:
+        cell_size (int): Width and height of a grid cell in pixels.
+    """
+    def __init__(self, cell_size: int = SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {} # (col, row) -> list of items
+        self.item_cells = {} # id(item) -> cells the item is stored in
+        self.order = {} # id(item) -> insertion index, keeps query results stable
+        self.counter = 0
+
+    def __len__(self):
+        return len(self.order)
+
+    def __contains__(self, item):
+        return id(item) in self.order
+
+    def get_cells(self, rect: pg.Rect):
+        """Get the (col, row) of every cell a rect touches."""
+        size = self.cell_size
+        first_col = rect.left // size
+        last_col = (rect.right - 1) // size if rect.width > 0 else first_col
+        first_row = rect.top // size
+        last_row = (rect.bottom - 1) // size if rect.height > 0 else first_row
+        return [
+            (col, row)
+            for row in range(first_row, last_row + 1)
+            for col in range(first_col, last_col + 1)
+        ]
+
+    def insert(self, item):
+        """Add an object to the grid using its current rect."""
+        if item in self:
+            self.move(item)
+            return
+        self.order[id(item)] = self.counter
+        self.counter += 1
+        self.add_to_cells(item, self.get_cells(item.rect))
+
+    def remove(self, item):
+        """Remove an object from the grid."""
+        if item not in self:
+            return
+        self.remove_from_cells(item, self.item_cells.pop(id(item)))
+        del self.order[id(item)]
+
+    def move(self, item):
+        """Update an object's cells after its rect has changed."""
+        if item not in self:
+            self.insert(item)
+            return
+        cells = self.get_cells(item.rect)
+        if cells != self.item_cells[id(item)]:
+            self.remove_from_cells(item, self.item_cells[id(item)])
+            self.add_to_cells(item, cells)
+
+    def add_to_cells(self, item, cells):
+        """Store an object in a list of cells."""
+        self.item_cells[id(item)] = cells
+        for cell in cells:
+            self.cells.setdefault(cell, []).append(item)
+
+    def remove_from_cells(self, item, cells):
+        """Remove an object from a list of cells, dropping cells left empty."""
+        for cell in cells:
+            bucket = self.cells[cell]
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[cell]
+
+    def query_point(self, point) -> list:
+        """Get every object whose rect contains a point.
+
+        Returns:
+            list: The objects, in the order they were inserted.
+        """
+        cell = (int(point[0]) // self.cell_size, int(point[1]) // self.cell_size)
+        found = [item for item in self.cells.get(cell, ()) if item.rect.collidepoint(point)]
+        return sorted(found, key=lambda item: self.order[id(item)])
+
+    def first_collision(self, rect: pg.Rect, ignore = None):
+        """Get the first inserted object whose rect intersects an area.
+
+        Args:
+            rect (pg.Rect): The area to check.
+            ignore (optional): An object to leave out, e.g. the one asking.
+
+        Returns:
+            The object, or None if the area is clear.
+        """
+        hit = None
+        for cell in self.get_cells(rect):
+            for item in self.cells.get(cell, ()):
+                if item is ignore or not rect.colliderect(item.rect):
+                    continue
+                if hit is None or self.order[id(item)] < self.order[id(hit)]:
+                    hit = item
+        return hit
+
+    def query_rect(self, rect: pg.Rect) -> list:
+        """Get every object whose rect intersects an area.
+
+        Returns:
+            list: The objects, in the order they were inserted.
+        """
+        found = {}
+        for cell in self.get_cells(rect):
+            for item in self.cells.get(cell, ()):
+                if id(item) not in found and rect.colliderect(item.rect):
+                    found[id(item)] = item
+        return sorted(found.values(), key=lambda item: self.order[id(item)])
+
+    def clear(self):
+        """Remove every object from the grid."""
+        self.cells.clear()
+        self.item_cells.clear()
+        self.order.clear()
+        self.counter = 0
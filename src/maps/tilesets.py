@@ -0,0 +1,161 @@
+"""
+Tilesets Module
+
+This module defines the `TilesetCache` class, a process-wide store of tileset
+images shared by every `TiledMap`. Maps hand pytmx an image loader from the cache
+instead of `pytmx.load_pygame`'s default one, so a tileset used by several maps
+is decoded once and each of its tiles is cut out and converted once.
+
+Tileset images are kept in the `SURFACES` cache with the loading map as their
+owner. Tiles are only cut out when a map actually uses them, and the tiles of a
+tileset no loaded map references are dropped by `release_unused`.
+
+Maps read on a worker thread use an unconverted loader instead, which cuts tiles
+from its own decoded copy of each tileset and leaves converting them to the game
+thread, since only that thread may touch the display.
+"""
+
+from pathlib import Path
+import threading
+import pygame as pg
+from pytmx.util_pygame import handle_transformation, smart_convert
+from utils.asset_store import ASSETS
+from utils.surface_cache import SURFACES
+
+class TilesetCache:
+    """
+    TilesetCache Class
+
+    Shared cache of tileset images and the tiles cut from them.
+
+    Attributes:
+        tiles (dict): Converted tile surfaces per tileset path, keyed by the
+            tile's (rect, flags, colorkey) in the tileset image.
+        hits (int): Number of tiles served from the cache.
+        misses (int): Number of tiles that had to be cut from their tileset.
+    """
+    def __init__(self) -> None:
+        self.tiles = {}
+        self.hits = 0
+        self.misses = 0
+        # Maps may be loaded on the prefetch thread while the game thread loads another
+        self.lock = threading.Lock()
+
+    def get_loader(self, owner, convert: bool = True):
+        """Create a pytmx image loader that shares tiles through the cache.
+
+        Args:
+            owner: The map the tilesets are loaded for. It keeps its tilesets
+                in use until it is released or garbage collected.
+            convert (bool): Whether tiles are converted and shared through the
+                cache. Unconverted tiles are cut from the loader's own copy of
+                each tileset and are safe to make off the game thread.
+
+        Returns:
+            A function with the signature pytmx expects of an `image_loader`.
+        """
+        images = {} # tileset path -> decoded image, for unconverted tiles
+
+        def image_loader(filename: str, colorkey, **_kwargs):
+            path = Path(filename).resolve()
+            if colorkey:
+                colorkey = pg.Color(f"#{colorkey}")
+
+            def load_image(rect = None, flags = None):
+                if convert:
+                    return self.get_tile(path, owner, rect, flags, colorkey)
+                if path not in images:
+                    images[path] = ASSETS.load_image(path)
+                return cut_tile(images[path], rect, flags, colorkey)
+
+            return load_image
+
+        return image_loader
+
+    def get_tile(self, path: Path, owner, rect = None, flags = None, colorkey = None) -> pg.Surface:
+        """Retrieve a converted tile from a tileset, cutting it out if needed.
+
+        Args:
+            path (Path): Path to the tileset image.
+            owner: Object that keeps the tileset in use.
+            rect (tuple, optional): Area of the tile in the tileset image. The
+                whole image is used if no rect is given.
+            flags (TileFlags, optional): How the tile is flipped or rotated.
+            colorkey (pg.Color, optional): Transparent color of the tileset.
+
+        Returns:
+            pg.Surface: The shared tile. Callers must not draw onto it.
+        """
+        key = (
+            tuple(rect) if rect else None,
+            tuple(flags) if flags else None,
+            tuple(colorkey) if colorkey else None
+        )
+        with self.lock:
+            image = SURFACES.load(path, owner=owner)
+            tiles = self.tiles.setdefault(path, {})
+            if key in tiles:
+                self.hits += 1
+                return tiles[key]
+            self.misses += 1
+            tile = image.subsurface(rect) if rect else image.copy()
+            if flags:
+                tile = handle_transformation(tile, flags)
+            tile = smart_convert(tile, colorkey, True)
+            tiles[key] = tile
+            return tile
+
+    def release(self, owner):
+        """Remove an owner's references to its tilesets."""
+        with self.lock:
+            for path in self.tiles:
+                SURFACES.release(owner, path)
+
+    def release_unused(self) -> int:
+        """Drop the tiles of every tileset no owner references.
+
+        Returns:
+            int: The number of tilesets dropped.
+        """
+        with self.lock:
+            unused = [path for path in self.tiles if SURFACES.get_ref_count(path) == 0]
+            for path in unused:
+                del self.tiles[path]
+        return len(unused)
+
+    def get_memory_usage(self) -> int:
+        """Bytes of pixel data held by the cut out tiles."""
+        return sum(
+            tile.get_width() * tile.get_height() * tile.get_bytesize()
+            for tiles in self.tiles.values()
+            for tile in tiles.values()
+        )
+
+    def get_stats(self) -> dict:
+        """Retrieve the hit/miss counters and number of cached tilesets and tiles."""
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "tilesets" : len(self.tiles),
+            "tiles" : sum(len(tiles) for tiles in self.tiles.values())
+        }
+
+TILESETS = TilesetCache()
+
+def cut_tile(image: pg.Surface, rect = None, flags = None, colorkey = None) -> pg.Surface:
+    """Cut a tile out of a tileset without converting it to the display's format.
+
+    The tile is given the pixel format `smart_convert` would pick for it: tiles
+    with a colorkey or without transparent pixels drop their alpha channel.
+    Converting it later then gives the same surface the cache would have.
+    """
+    tile = image.subsurface(rect) if rect else image.copy()
+    if flags:
+        tile = handle_transformation(tile, flags)
+    if tile.get_flags() & pg.SRCALPHA:
+        opaque = pg.mask.from_surface(tile, 254).count() == tile.get_width() * tile.get_height()
+        if colorkey or opaque:
+            tile = pg.image.frombytes(pg.image.tobytes(tile, "RGB"), tile.get_size(), "RGB")
+    if colorkey:
+        tile.set_colorkey(colorkey)
+    return tile
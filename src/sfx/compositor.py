@@ -0,0 +1,118 @@
+"""
+Compositor module.
+
+This module defines the `ScreenCompositor` class, which draws full screen
+effects such as fades and color tints. Every effect covers the screen with a
+color at some opacity, so any number of stacked effects can be folded into a
+single equivalent color and opacity and drawn in one pass.
+
+The pass uses the cheapest way pygame has to draw it: a plain fill when the
+result is opaque, a multiply fill when it is black, and otherwise a blit of an
+overlay surface kept per screen size. Nothing is allocated while effects run.
+"""
+
+import pygame as pg
+from utils.display import DISPLAY
+from utils.surface_cache import convert_surface
+
+class ScreenCompositor:
+    """
+    ScreenCompositor Class
+
+    Draws stacked screen effects in a single pass.
+
+    Attributes:
+        overlays (dict): Reused overlay surfaces keyed by screen size.
+        colors (dict): Color each overlay is currently filled with.
+    """
+    def __init__(self) -> None:
+        self.overlays = {}
+        self.colors = {}
+        DISPLAY.subscribe(self.on_resize)
+
+    def draw(self, screen: pg.Surface, effects):
+        """Draw effects over the screen, as if each were drawn in turn.
+
+        Args:
+            screen (pg.Surface): The surface to draw on.
+            effects: Objects with a `get_overlay()` method returning the
+                (color, alpha) they cover the screen with, bottom effect first.
+        """
+        color, alpha = combine_overlays(effect.get_overlay() for effect in effects)
+        alpha = round(alpha)
+        if alpha <= 0:
+            return
+        if alpha >= 255:
+            screen.fill(color)
+        elif color == (0, 0, 0):
+            # Darkening needs no overlay, each pixel is scaled towards black
+            keep = 255 - alpha
+            screen.fill((keep, keep, keep), special_flags=pg.BLEND_RGB_MULT)
+        else:
+            overlay = self.get_overlay(screen.get_size(), color)
+            overlay.set_alpha(alpha)
+            screen.blit(overlay, (0, 0))
+
+    def get_overlay(self, size: tuple[int, int], color) -> pg.Surface:
+        """Get the overlay surface for a screen size, filled with a color."""
+        overlay = self.overlays.get(size)
+        if overlay is None:
+            overlay = convert_surface(pg.Surface(size))
+            self.overlays[size] = overlay
+            self.colors[size] = None
+        if self.colors[size] != color:
+            overlay.fill(color)
+            self.colors[size] = color
+        return overlay
+
+    def on_resize(self, _size):
+        """Drop the overlays made for the old screen size."""
+        self.overlays.clear()
+        self.colors.clear()
+
+SCREEN_EFFECTS = ScreenCompositor()
+
+def combine_overlays(overlays) -> tuple[tuple[int, int, int], float]:
+    """Fold stacked (color, alpha) overlays into one that looks the same.
+
+    Drawing color c1 at opacity a1 and then c2 at a2 gives every pixel
+    p * (1 - a1) * (1 - a2) + c1 * a1 * (1 - a2) + c2 * a2, which is a single
+    overlay of opacity 1 - (1 - a1) * (1 - a2).
+
+    Returns:
+        tuple: The combined color and alpha, from 0 to 255.
+    """
+    kept = 1.0 # How much of the screen shows through
+    red = green = blue = 0.0 # Color added on top, premultiplied by its opacity
+    for color, alpha in overlays:
+        alpha = min(max(alpha / 255, 0.0), 1.0)
+        red = red * (1 - alpha) + color[0] * alpha
+        green = green * (1 - alpha) + color[1] * alpha
+        blue = blue * (1 - alpha) + color[2] * alpha
+        kept *= 1 - alpha
+    coverage = 1 - kept
+    if coverage <= 0:
+        return (0, 0, 0), 0
+    color = (round(red / coverage), round(green / coverage), round(blue / coverage))
+    return color, coverage * 255
+
+class ScreenTint:
+    """A color laid over the whole screen, such as a red flash or night time.
+
+    Args:
+        color (tuple): The tint's color.
+        alpha (int): The tint's opacity, from 0 to 255.
+    """
+    def __init__(self, color, alpha: int) -> None:
+        self.color = tuple(color)
+        self.alpha = alpha
+
+    def update(self):
+        pass
+
+    def get_overlay(self) -> tuple:
+        """The (color, alpha) the tint covers the screen with."""
+        return self.color, self.alpha
+
+    def draw(self, screen, _camera):
+        SCREEN_EFFECTS.draw(screen, [self])
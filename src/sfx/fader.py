@@ -1,16 +1,12 @@
-import pygame as pg
 from states.sequencer import Scene, SceneAction, ExecutableMethod, Sequencer
 from config.game_settings import FPS
+from sfx.compositor import SCREEN_EFFECTS
 
 class Fader:
     def __init__(self, game_state, is_fade_in, color = (0,0,0), fade_time = 1) -> None:
-        info = pg.display.Info()
         self.is_fade_in = is_fade_in
         self.gs = game_state
-        self.img = pg.Surface(
-            (info.current_w,info.current_h), # screen size
-            pg.SRCALPHA # allow alpha
-            )
+        self.alpha = 255 if is_fade_in else 0
         self.fade_time = fade_time
         self.color = color
         self.timer = 0
@@ -21,11 +17,15 @@ class Fader:
             alpha = max(0, 255 - (255 * (self.timer / self.fade_time))) # Fade out
         else:
             alpha = min(255 * (self.timer / self.fade_time), 255) # Fade in
-        self.img.set_alpha(alpha)
+        self.alpha = alpha
+
+    def get_overlay(self):
+        """The (color, alpha) the fade covers the screen with."""
+        return self.color, self.alpha
 
     def draw(self, screen, _camera):
-        self.img.fill(self.color)
-        screen.blit(self.img, (0,0))
+        # Stacked effects are drawn together by the gameplay state, see SCREEN_EFFECTS
+        SCREEN_EFFECTS.draw(screen, [self])
 
     def is_done(self):
         return self.timer > self.fade_time
@@ -7,6 +7,8 @@ where the player is choosing character attributes.
 
 import pygame as pg
 from states.states import State
+from gui.text_cache import TextLayer
+from gui.skins import SKINS
 from entities.player_character import PlayerCharacter
 from items.wand import Wand, WandCore, WandLength, WandWood
 from entities.inventory import CharacterInventory
@@ -24,7 +26,8 @@ class CharacterCreationState(State):
     def __init__(self, manager):
         """Initialize the Character Creation State."""
         super().__init__(manager)
-        self.font = pg.font.Font(None, 36)
+        self.font = SKINS.get_font()
+        self.text = TextLayer() # Rendered title and options
         self.options = {
             'Name' : ['Dylan', 'Cody', 'Bob'],
             'Wand Wood' : ['Oak', 'Pine', 'Larch'],
@@ -85,17 +88,16 @@ class CharacterCreationState(State):
         screen.fill(MYSTIC_RED)
         # Add Title
         text_color = WHITE
-        text = self.font.render("Character Creation Screen", True, text_color)
-        text_rect = text.get_rect(center=(screen.get_width() // 2, 100))
-        screen.blit(text, text_rect)
-        # Add Options
+        self.text.set_line(
+            "title", self.font, "Character Creation Screen", text_color, (screen.get_width() // 2, 100)
+        )
+        # Add Options, only options whose choice or selection changed are rendered again
         for i, attribute in enumerate(self.options):
             text_color = WHITE if i == self.current_attr else LIGHTGREY
             if attribute in ["Back", "Start Game"]: text = attribute
             else: text = f"{attribute}: {self.options[attribute][self.attr_idx[i]]}"
-            text = self.font.render(text, True, text_color)
-            text_rect = text.get_rect(center=(screen.get_width() // 2, 200 + i * 50))
-            screen.blit(text, text_rect)
+            self.text.set_line(i, self.font, text, text_color, (screen.get_width() // 2, 200 + i * 50))
+        self.text.draw(screen)
 
     def make_player(self) -> PlayerCharacter:
         """
@@ -5,19 +5,25 @@ This module defines the `GameplayState` class, which represents the game state
 where the player is actively playing the game.
 """
 
-import json
 from pathlib import Path
 import pygame as pg
 from states.states import State
 from config.colors import MYSTIC_BLUE, BLACK
 from config.game_settings import TILESIZE
+from config.cache_settings import PORTAL_PREFETCH_DISTANCE
 from config.directories import USER_GAME_DIR, DATA_DIR
 from utils.save_system import save_game_data
+from utils.surface_cache import SURFACES
+from utils.sprite_atlas import ATLAS
+from utils.display import DISPLAY
+from utils.asset_store import ASSETS
 from entities.player_character import PlayerCharacter
 from entities.npc import NPC
 from maps.map import TiledMap
+from maps.map_cache import MAP_CACHE
 from maps.camera import Camera
 from sfx.fader import Fader, get_fade_action
+from sfx.compositor import SCREEN_EFFECTS
 from maps.portals import Portal, Door
 from states.sequencer import Scene, Sequencer, ExecutableMethod, SceneAction
 from states.sub_message import MessageBoxSubState
@@ -51,6 +57,7 @@ class GameplayState(State):
         self.sprite_groups = self.init_sprite_groups()
         self.quest_data = None
         self.sequences = []
+        self.cull_stats = {}
 
     def handle_events(self, events):
         """Handle events in the gameplay state.
@@ -72,8 +79,6 @@ class GameplayState(State):
                 match event.key:
                     case pg.K_y:
                         self.save_game()
-            if event.type == pg.VIDEORESIZE:
-                self.camera.change_screen_size()
 
     def handle_player_events(self, events):
         """Logic for key up/down events involving the player character."""
@@ -82,8 +87,7 @@ class GameplayState(State):
                 match event.key:
                     case pg.K_SPACE:
                         if self.player.is_idle():
-                            items = self.map.items["obstacles"] + self.map.items["portals"]
-                            return self.player.interact(items, self)
+                            return self.player.interact(self.map, self)
                     ########## TEST EVENTS #############
                     case pg.K_i:
                         if "idle" in self.player.appearance.current_anim:
@@ -110,20 +114,19 @@ class GameplayState(State):
     def handle_continuous_player_movement(self):
         """Handle continuous player movement based on currently pressed keys."""
         response =  None
-        obstacles = self.map.items["obstacles"] + self.map.items["portals"]
         keys = pg.key.get_pressed()
         if keys[pg.K_UP] or keys[pg.K_w]:
             self.player.set_animation("walk_up")
-            response = self.player.change_destination(0, -TILESIZE, obstacles)
+            response = self.player.change_destination(0, -TILESIZE, self.map)
         elif keys[pg.K_DOWN] or keys[pg.K_s]:
             self.player.set_animation("walk_down")
-            response = self.player.change_destination(0, TILESIZE, obstacles)
+            response = self.player.change_destination(0, TILESIZE, self.map)
         elif keys[pg.K_LEFT] or keys[pg.K_a]:
             self.player.set_animation("walk_left")
-            response = self.player.change_destination(-TILESIZE, 0, obstacles)
+            response = self.player.change_destination(-TILESIZE, 0, self.map)
         elif keys[pg.K_RIGHT] or keys[pg.K_d]:
             self.player.set_animation("walk_right")
-            response = self.player.change_destination(TILESIZE, 0, obstacles)
+            response = self.player.change_destination(TILESIZE, 0, self.map)
         if response:
             return self.handle_player_collision_events(response)
         return None
@@ -136,8 +139,31 @@ class GameplayState(State):
             """Update logic for the gameplay state."""
             for sprite in self.sprite_groups["all_sprites"]:
                 sprite.update()
+            for npc in self.sprite_groups["npcs"]:
+                npc.think(self.map)
+            for character in self.sprite_groups["characters"]:
+                self.map.move_entity(character)
             self.map.update()
             self.camera.update(self.player.hitbox)
+            self.prefetch_nearby_maps()
+
+    def prefetch_nearby_maps(self):
+        """Start loading the maps of portals close to the player in the background."""
+        area = self.player.hitbox.rect.inflate(
+            2 * PORTAL_PREFETCH_DISTANCE * TILESIZE,
+            2 * PORTAL_PREFETCH_DISTANCE * TILESIZE
+        )
+        for portal in self.map.visibility['portals'].query_rect(area):
+            self.prefetch_portal(portal)
+
+    def prefetch_portal(self, portal):
+        """Start loading the map a portal leads to in the background."""
+        if portal.name != self.map.name:
+            MAP_CACHE.prefetch(
+                portal.name,
+                spawn_pid=portal.to_pid,
+                view_size=(self.camera.screen_w, self.camera.screen_h)
+            )
 
     def draw(self, screen):
         """Draw the gameplay on the screen.
@@ -148,10 +174,40 @@ class GameplayState(State):
         screen.fill(MYSTIC_BLUE)
         self.map.draw(screen, self.camera)
         self.draw_grid(screen)
+        view = self.camera.get_view_rect()
+        culled = 0
+        batch = [] # Consecutive entities, drawn together from the sprite atlas
+        effects = [] # Screen effects, drawn together over everything else
         for sprite in self.sprite_groups["all_sprites"]:
+            # Screen effects like faders have no draw rect and are always drawn
+            if hasattr(sprite, "get_draw_rect") and not view.colliderect(sprite.get_draw_rect()):
+                culled += 1
+                continue
+            if hasattr(sprite, "get_blit"):
+                batch.append(sprite)
+                continue
+            if hasattr(sprite, "get_overlay"):
+                effects.append(sprite)
+                continue
+            self.draw_batch(screen, batch)
             sprite.draw(screen, self.camera)
+        self.draw_batch(screen, batch)
+        SCREEN_EFFECTS.draw(screen, effects)
+        self.cull_stats = {
+            "map" : self.map.cull_stats,
+            "sprites_culled" : culled
+        }
+
+    def draw_batch(self, screen, batch: list):
+        """Draw a batch of entities with a single blits call, then their debug rects."""
+        screen.blits([sprite.get_blit(self.camera) for sprite in batch], doreturn=False)
+        for sprite in batch:
+            sprite.draw_debug(screen, self.camera)
+        batch.clear()
 
     def use_portal(self, portal):
+        # Load the next map while the "Entering" scenes play
+        self.prefetch_portal(portal)
         # Play "Entering" Scenes
         SequencerSubState(self, portal.get_enter_seq(self)).run()
         # Change map and set player at corresponding portal
@@ -164,10 +220,7 @@ class GameplayState(State):
     def get_portal_by_pid(self, pid, tile_map = None):
         if tile_map is None:
             tile_map = self.map
-        for portal in tile_map.items['portals']:
-            if portal.pid == pid:
-                return portal
-        return None
+        return tile_map.get_portal_by_pid(pid)
 
     def add_sprite(self, sprite, groups):
         for group in groups:
@@ -175,7 +228,7 @@ class GameplayState(State):
 
     def draw_grid(self, screen):
         """Draw tiles on screen."""
-        w, h = pg.display.get_surface().get_size()
+        w, h = DISPLAY.size
         for x in range(0, w, TILESIZE):
             pg.draw.line(screen, BLACK, (x,0), (x, h))
         for y in range(0, h, TILESIZE):
@@ -232,26 +285,33 @@ class GameplayState(State):
             map_name (str): The name of the map to load.
         """
         # Clear sprites
+        for sprite in self.sprite_groups["characters"]:
+            if sprite is not self.player:
+                sprite.release_assets()
         self.sprite_groups = self.init_sprite_groups()
         # Load player
         self.add_sprite(self.player, ["all_sprites", "characters"])
-        # Load map
-        self.map = TiledMap(map_name)
+        # Load map, reusing it if it was visited recently
+        self.map = MAP_CACHE.get(map_name)
+        self.map.clear_entities()
+        self.map.add_entity(self.player)
         # Resize camera
         self.camera.open_map(self.map)
         # Load NPCs
-        with open(DATA_DIR / "npc_data.json", encoding="utf-8") as f:
-            npc_data = json.load(f)
+        npc_data = ASSETS.load_json(DATA_DIR / "npc_data.json")
         npc_data = npc_data["npcs"]
         for npc_id in npc_data:
             if npc_data[npc_id]["location"]["map"] == map_name:
                 npc = NPC(npc_id)
-                self.map.items["obstacles"].append(npc)
+                self.map.add_entity(npc)
                 self.add_sprite(npc, ["all_sprites", "characters", "npcs"])
         # bunny test, remove later
         bunny = Animal("jackalope")
-        self.map.items["obstacles"].append(bunny)
+        self.map.add_entity(bunny)
         self.add_sprite(bunny, ["all_sprites", "characters", "npcs"])
+        # Free sprite sheets and atlas pages nothing on the new map uses
+        SURFACES.evict()
+        ATLAS.release_unused()
 
     def load_player(self, player):
         """Load a player entity.
@@ -7,6 +7,8 @@ state design and logic.
 
 import pygame as pg
 from states.states import State
+from gui.text_cache import TextLayer
+from gui.skins import SKINS
 from config.colors import MYSTIC_PURPLE, WHITE, LIGHTGREY
 from config.game_settings import GAME_TITLE
 from utils.save_system import select_saved_game
@@ -29,11 +31,13 @@ class MainMenuState(State):
             selected_option (int): Index of the currently selected menu option.
             options (list): A list of available menu options.
             font (pygame.font.Font): The font used for rendering text.
+            text (TextLayer): The rendered title and options.
         """
         super().__init__(manager)
         self.selected_option = 0
         self.options = ["New Game", "Load Game"]
-        self.font = pg.font.Font(None, 36)
+        self.font = SKINS.get_font()
+        self.text = TextLayer()
 
     def handle_events(self, events):
         """Handle events in the main menu state.
@@ -75,15 +79,12 @@ class MainMenuState(State):
         screen.fill(MYSTIC_PURPLE)
         # Add Title
         text_color = WHITE
-        text = self.font.render(GAME_TITLE, True, text_color)
-        text_rect = text.get_rect(center=(screen.get_width() // 2, 100))
-        screen.blit(text, text_rect)
-        # Add Options
+        self.text.set_line("title", self.font, GAME_TITLE, text_color, (screen.get_width() // 2, 100))
+        # Add Options, only options whose selection changed are rendered again
         for i, option in enumerate(self.options):
             text_color = WHITE if i == self.selected_option else LIGHTGREY
-            text = self.font.render(option, True, text_color)
-            text_rect = text.get_rect(center=(screen.get_width() // 2, 200 + i * 50))
-            screen.blit(text, text_rect)
+            self.text.set_line(i, self.font, option, text_color, (screen.get_width() // 2, 200 + i * 50))
+        self.text.draw(screen)
 
     def load_existing_game(self):
         """Load an existing game from a save file.
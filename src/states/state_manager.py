@@ -12,6 +12,7 @@ import pygame as pg
 from states.state_main_menu import MainMenuState
 from states.state_gameplay import GameplayState
 from states.state_character_creation import CharacterCreationState
+from utils.display import DISPLAY
 
 class StateManager:
     """Manages the game's state transitions and state-specific functions.
@@ -43,6 +44,7 @@ class StateManager:
         if pg.QUIT in (event.type for event in events):
             pg.quit()
             sys.exit()
+        DISPLAY.handle_events(events)
         self.state_dict[self.current_state].handle_events(events)
 
     def update(self):
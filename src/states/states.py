@@ -9,6 +9,8 @@ This module also provides a consistent interface for all game states.
 """
 import pygame as pg
 from config.game_settings import FPS
+from utils.asset_loader import ASSET_LOADER
+from utils.display import DISPLAY
 
 class State:
     """The `State` class is a foundational class for implementing specific
@@ -94,7 +96,10 @@ class SubState:
         This includes event handling, updating, and drawing the state. The loop should be controlled
         to start and stop at appropriate times by the subclass logic.
         """
-        self.handle_events(pg.event.get())
+        events = pg.event.get()
+        DISPLAY.handle_events(events)
+        self.handle_events(events)
+        ASSET_LOADER.update()
         self.update()
         self.draw(self.parent.manager.gm.screen)
         pg.display.flip()
@@ -0,0 +1,5 @@
+"""
+Unit tests for the game's pure helpers.
+
+Run them with `python -m unittest discover tests` from the src directory.
+"""
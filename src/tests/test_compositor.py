@@ -0,0 +1,56 @@
+"""Tests for folding stacked screen effects into a single overlay."""
+
+import random
+import unittest
+from sfx.compositor import combine_overlays
+
+def blend(pixel, overlays) -> list:
+    """A pixel after drawing each (color, alpha) overlay over it in turn."""
+    pixel = list(pixel)
+    for color, alpha in overlays:
+        alpha = min(max(alpha / 255, 0.0), 1.0)
+        pixel = [p * (1 - alpha) + c * alpha for p, c in zip(pixel, color)]
+    return pixel
+
+class CombineOverlaysTest(unittest.TestCase):
+    """Results of `combine_overlays`."""
+    def test_random_stacks_look_the_same_as_drawing_each(self):
+        rng = random.Random(0)
+        for _ in range(500):
+            overlays = [
+                (tuple(rng.randint(0, 255) for _ in range(3)), rng.uniform(0, 255))
+                for _ in range(rng.randint(1, 5))
+            ]
+            color, alpha = combine_overlays(overlays)
+            for pixel in ((0, 0, 0), (255, 255, 255), (rng.randint(0, 255), 90, 200)):
+                expected = blend(pixel, overlays)
+                actual = blend(pixel, [(color, alpha)])
+                for e, a in zip(expected, actual):
+                    # The combined color is rounded to whole values
+                    self.assertAlmostEqual(e, a, delta=0.51)
+
+    def test_no_overlays_cover_nothing(self):
+        self.assertEqual(combine_overlays([]), ((0, 0, 0), 0))
+        self.assertEqual(combine_overlays([((255, 0, 0), 0)]), ((0, 0, 0), 0))
+
+    def test_single_overlay_is_unchanged(self):
+        color, alpha = combine_overlays([((10, 20, 30), 128)])
+        self.assertEqual(color, (10, 20, 30))
+        self.assertAlmostEqual(alpha, 128)
+
+    def test_black_fades_stay_black(self):
+        color, alpha = combine_overlays([((0, 0, 0), 127.5), ((0, 0, 0), 127.5)])
+        self.assertEqual(color, (0, 0, 0))
+        self.assertAlmostEqual(alpha, 255 * 0.75)
+
+    def test_opaque_overlay_hides_the_ones_below(self):
+        color, alpha = combine_overlays([((255, 0, 0), 200), ((0, 0, 255), 255)])
+        self.assertEqual(color, (0, 0, 255))
+        self.assertAlmostEqual(alpha, 255)
+
+    def test_alpha_is_clamped(self):
+        self.assertAlmostEqual(combine_overlays([((0, 0, 0), 300)])[1], 255)
+        self.assertEqual(combine_overlays([((0, 0, 0), -20)]), ((0, 0, 0), 0))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""Tests for merging the wall rects of a map's Obstacles layer."""
+
+import random
+import unittest
+import pygame as pg
+from maps.geometry import merge_rects
+
+def get_cells(rects) -> set:
+    """Every unit square covered by the rects."""
+    return {
+        (x, y)
+        for rect in rects
+        for x in range(rect.left, rect.right)
+        for y in range(rect.top, rect.bottom)
+    }
+
+class MergeRectsTest(unittest.TestCase):
+    """Rects returned by `merge_rects`."""
+    def test_random_walls_keep_their_area(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            rects = [
+                pg.Rect(
+                    rng.randint(0, 12) * 4, rng.randint(0, 12) * 4,
+                    rng.randint(1, 4) * 4, rng.randint(1, 4) * 4
+                )
+                for _ in range(rng.randint(0, 20))
+            ]
+            merged = merge_rects(rects)
+            self.assertEqual(get_cells(merged), get_cells(rects))
+            self.assertLessEqual(len(merged), len(rects))
+
+    def test_row_of_tiles_becomes_one_rect(self):
+        rects = [pg.Rect(x * 32, 64, 32, 32) for x in range(10)]
+        self.assertEqual(merge_rects(rects), [pg.Rect(0, 64, 320, 32)])
+
+    def test_block_of_tiles_becomes_one_rect(self):
+        rects = [pg.Rect(x * 32, y * 32, 32, 32) for x in range(4) for y in range(3)]
+        self.assertEqual(merge_rects(rects), [pg.Rect(0, 0, 128, 96)])
+
+    def test_l_shape_needs_two_rects(self):
+        rects = [pg.Rect(0, 0, 32, 96), pg.Rect(32, 64, 64, 32)]
+        merged = merge_rects(rects)
+        self.assertEqual(len(merged), 2)
+        self.assertEqual(get_cells(merged), get_cells(rects))
+
+    def test_separate_and_empty_rects(self):
+        rects = [pg.Rect(0, 0, 32, 32), pg.Rect(64, 0, 32, 32), pg.Rect(10, 10, 0, 5)]
+        self.assertEqual(sorted(map(tuple, merge_rects(rects))), [(0, 0, 32, 32), (64, 0, 32, 32)])
+        self.assertEqual(merge_rects([]), [])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""Tests for the skyline packer that places frames in the sprite atlas."""
+
+import random
+import unittest
+from utils.sprite_atlas import SkylinePacker
+
+class SkylinePackerTest(unittest.TestCase):
+    """Rectangles placed by `SkylinePacker.insert`."""
+    def fill(self, packer: SkylinePacker, sizes) -> list:
+        placed = []
+        for width, height in sizes:
+            rect = packer.insert(width, height)
+            if rect is not None:
+                self.assertEqual(rect.size, (width, height))
+                placed.append(rect)
+        return placed
+
+    def assert_packed(self, packer: SkylinePacker, placed: list):
+        for i, rect in enumerate(placed):
+            self.assertTrue(
+                0 <= rect.left and rect.right <= packer.width
+                and 0 <= rect.top and rect.bottom <= packer.height,
+                f"{rect} is outside the {packer.width}x{packer.height} area"
+            )
+            self.assertEqual(rect.collidelist(placed[i + 1:]), -1, f"{rect} overlaps another rect")
+        self.assertEqual(packer.used_area, sum(rect.width * rect.height for rect in placed))
+
+    def test_random_rects_never_overlap(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            packer = SkylinePacker(rng.randint(32, 256), rng.randint(32, 256))
+            sizes = [(rng.randint(1, 64), rng.randint(1, 64)) for _ in range(200)]
+            self.assert_packed(packer, self.fill(packer, sizes))
+
+    def test_frames_of_one_size_tile_the_area(self):
+        packer = SkylinePacker(128, 128)
+        placed = self.fill(packer, [(32, 32)] * 17)
+        self.assertEqual(len(placed), 16)
+        self.assertEqual(packer.used_area, 128 * 128)
+        self.assert_packed(packer, placed)
+
+    def test_rect_larger_than_area_is_rejected(self):
+        packer = SkylinePacker(64, 64)
+        self.assertIsNone(packer.insert(65, 1))
+        self.assertIsNone(packer.insert(1, 65))
+        self.assertEqual(packer.used_area, 0)
+
+    def test_rect_goes_to_lowest_spot(self):
+        packer = SkylinePacker(64, 64)
+        packer.insert(32, 48)
+        packer.insert(32, 16)
+        self.assertEqual(packer.insert(32, 16).topleft, (32, 16))
+
+if __name__ == "__main__":
+    unittest.main()
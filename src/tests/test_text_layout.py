@@ -0,0 +1,60 @@
+"""Tests for laying out message box text in slides."""
+
+import random
+import unittest
+import pygame as pg
+from gui.text_layout import TextLayout
+
+class PaginateTest(unittest.TestCase):
+    """Slides returned by `TextLayout.paginate`."""
+    @classmethod
+    def setUpClass(cls):
+        pg.font.init()
+        cls.font = pg.font.Font(None, 24)
+
+    def paginate(self, text: str, width: int, height: int) -> list:
+        return TextLayout(self.font, width, height).paginate(text)
+
+    def assert_laid_out(self, text: str, width: int, height: int):
+        slides = self.paginate(text, width, height)
+        words = [word for slide in slides for word, _ in slide]
+        self.assertEqual(words, [f"{word} " for word in text.split(" ")])
+        for slide in slides:
+            self.assertTrue(slide, "empty slide")
+            for word, (x, y) in slide:
+                word_w, word_h = self.font.size(word)
+                if x > 0:
+                    self.assertLessEqual(x + word_w, width, f"{word!r} runs past the box")
+                if len(slide) > 1:
+                    self.assertLessEqual(y + word_h, height, f"{word!r} runs below the box")
+        return slides
+
+    def test_random_text_keeps_every_word_inside_the_box(self):
+        rng = random.Random(0)
+        for _ in range(50):
+            text = " ".join(
+                "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(1, 12)))
+                for _ in range(rng.randint(1, 150))
+            )
+            self.assert_laid_out(text, rng.randint(60, 600), rng.randint(20, 200))
+
+    def test_short_text_fits_on_one_line(self):
+        slides = self.assert_laid_out("Oh look a bunny!", 600, 100)
+        self.assertEqual(len(slides), 1)
+        self.assertTrue(all(y == 0 for _, (_, y) in slides[0]))
+
+    def test_slide_break_keeps_the_next_word(self):
+        line = self.font.size("Tg")[1]
+        slides = self.assert_laid_out(" ".join(["word"] * 40), 100, line * 2)
+        self.assertGreater(len(slides), 1)
+        for slide in slides:
+            self.assertEqual(slide[0][1], (0, 0))
+
+    def test_word_wider_than_the_box_gets_its_own_line(self):
+        slides = self.assert_laid_out("a supercalifragilisticexpialidocious b", 40, 200)
+        positions = [pos for slide in slides for _, pos in slide]
+        self.assertEqual(positions[1][0], 0)
+        self.assertEqual(positions[2][0], 0)
+
+if __name__ == "__main__":
+    unittest.main()
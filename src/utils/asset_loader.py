@@ -0,0 +1,186 @@
+"""
+Asset Loader module.
+
+This module defines the `AssetLoader` class, which reads, decodes and parses
+assets on a pool of worker threads so the game loop keeps running while they
+load. Every load returns a `concurrent.futures.Future`, and asking for an asset
+that is already loading returns the same future instead of loading it twice.
+
+Some results need a last step on the main thread, such as converting a decoded
+image to the display's pixel format. Those steps are queued by the workers and
+run by `update`, which the game calls once per frame, before the future is
+resolved.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+import queue
+import threading
+import pygame as pg
+from config.cache_settings import ASSET_LOADER_WORKERS
+from utils.asset_store import ASSETS
+from utils.asset_management import get_sheet_data
+from utils.surface_cache import SURFACES, convert_surface
+
+class AssetLoader:
+    """Loads assets on worker threads and hands them back through futures.
+
+    Args:
+        max_workers (int): Number of worker threads.
+
+    Attributes:
+        pending (dict): Futures of the loads in flight, keyed by what is loading.
+        loaded (int): Number of loads completed.
+        deduped (int): Number of requests served by a load already in flight.
+    """
+    def __init__(self, max_workers: int = ASSET_LOADER_WORKERS) -> None:
+        self.max_workers = max_workers
+        self.executor = None
+        self.pending = {}
+        self.work = {} # key -> Future of the worker's part of a load
+        self.finishing = queue.SimpleQueue()
+        self.lock = threading.Lock()
+        self.loaded = 0
+        self.deduped = 0
+
+    def submit(self, key, load, *args, finalize = None) -> Future:
+        """Run a load on a worker thread.
+
+        Args:
+            key: Identifies what is being loaded. A load with the same key as
+                one in flight returns that load's future.
+            load (callable): Does the loading on the worker thread.
+            *args: Arguments for `load`.
+            finalize (callable, optional): Called with the loaded value on the
+                main thread. Its return value is the future's result.
+
+        Returns:
+            Future: Resolved with the loaded value.
+        """
+        with self.lock:
+            if key in self.pending:
+                self.deduped += 1
+                return self.pending[key]
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="asset_loader"
+                )
+            future = Future()
+            work = self.executor.submit(load, *args)
+            self.pending[key] = future
+            self.work[key] = work
+        work.add_done_callback(lambda work: self.on_loaded(key, future, work, finalize))
+        return future
+
+    def on_loaded(self, key, future: Future, work: Future, finalize):
+        """Resolve a load once its worker is done, or queue it for the main thread."""
+        if work.cancelled():
+            self.finish(key, future, work)
+        elif finalize is None or work.exception() is not None:
+            self.finish(key, future, work)
+        else:
+            self.finishing.put((key, future, work, finalize))
+
+    def finish(self, key, future: Future, work: Future, finalize = None):
+        """Resolve a load's future with its result or error."""
+        with self.lock:
+            if self.pending.get(key) is future:
+                del self.pending[key]
+                del self.work[key]
+            self.loaded += 1
+        if work.cancelled():
+            future.cancel()
+            return
+        try:
+            result = work.result()
+            if finalize is not None:
+                result = finalize(result)
+        except Exception as e: # pylint: disable=broad-exception-caught
+            future.set_exception(e)
+            return
+        future.set_result(result)
+
+    def update(self) -> int:
+        """Run the main thread steps of every load whose worker has finished.
+
+        Returns:
+            int: The number of loads finished.
+        """
+        finished = 0
+        while True:
+            try:
+                item = self.finishing.get_nowait()
+            except queue.Empty:
+                return finished
+            self.finish(*item)
+            finished += 1
+
+    def wait(self, future: Future, timeout: float = None):
+        """Block the main thread until a load is done and return its result.
+
+        Main thread steps are run while waiting, so this doesn't deadlock on
+        loads that need them.
+        """
+        while not future.done():
+            try:
+                item = self.finishing.get(timeout=timeout if timeout is not None else 0.05)
+            except queue.Empty:
+                if timeout is not None:
+                    break
+                continue
+            self.finish(*item)
+        return future.result(timeout=0)
+
+    def cancel(self, future: Future) -> bool:
+        """Cancel a load that hasn't started yet.
+
+        Returns:
+            bool: Whether the load was cancelled.
+        """
+        with self.lock:
+            work = next(
+                (self.work[key] for key, pending in self.pending.items() if pending is future),
+                None
+            )
+        # Cancelling runs the load's done callback, which takes the lock itself
+        return work is not None and work.cancel()
+
+    def load_image(self, path: Path) -> Future:
+        """Decode an image on a worker and convert it on the main thread.
+
+        The image is added to the `SURFACES` cache, so later loads of it are
+        served from memory.
+        """
+        path = Path(path)
+        return self.submit(
+            ("image", path),
+            ASSETS.load_image,
+            path,
+            finalize=lambda image: SURFACES.add(path, convert_surface(image))
+        )
+
+    def load_sheet_data(self, path: Path) -> Future:
+        """Parse a sprite sheet's .toml file into the sprite metadata cache."""
+        path = Path(path).with_suffix(".toml")
+        return self.submit(("sheet_data", path), get_sheet_data, path)
+
+    def load_json(self, path: Path) -> Future:
+        """Parse a .json file."""
+        path = Path(path)
+        return self.submit(("json", path), ASSETS.load_json, path)
+
+    def load_toml(self, path: Path) -> Future:
+        """Parse a .toml file."""
+        path = Path(path)
+        return self.submit(("toml", path), ASSETS.load_toml, path)
+
+    def get_stats(self) -> dict:
+        """Retrieve the number of loads completed, deduplicated and in flight."""
+        return {
+            "loaded" : self.loaded,
+            "deduped" : self.deduped,
+            "pending" : len(self.pending)
+        }
+
+ASSET_LOADER = AssetLoader()
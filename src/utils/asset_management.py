@@ -3,28 +3,169 @@ Asset Management module.
 
 This module contains functions related to asset management.
 For example loading the information for an animation from a sprite sheet.
+
+Sprite sheet metadata is parsed once per file and kept in a process-wide
+cache (`SPRITE_METADATA`). Entries are keyed by path and modification time,
+so editing a .toml file on disk is picked up on the next lookup.
 """
 
-import toml
+from dataclasses import dataclass
 from pathlib import Path
+from types import MappingProxyType
+from utils.asset_store import ASSETS
+
+@dataclass(frozen=True)
+class AnimationData:
+    """Immutable description of a single animation in a sprite sheet.
+
+    Attributes:
+        name (str): Name of the animation in the related toml file.
+        frame_w (int): Width of the images in the sheet.
+        frame_h (int): Height of the images in the sheet.
+        duration (int): How many ticks each frame is drawn.
+        row (int): Which row of the sprite sheet the animation is on.
+        seq (tuple[int]): Sequence of columns that create the animation.
+    """
+    name: str
+    frame_w: int
+    frame_h: int
+    duration: int
+    row: int
+    seq: tuple[int, ...]
+
+@dataclass(frozen=True)
+class SpriteSheetData:
+    """Immutable description of a sprite sheet's .toml file.
+
+    Attributes:
+        path (Path): Path to the .toml file.
+        tile_w (int): Width of each frame in the sheet.
+        tile_h (int): Height of each frame in the sheet.
+        hit_box_w (int): Width of the hitbox of the sprite.
+        hit_box_h (int): Height of the hitbox of the sprite.
+        animations (Mapping[str, AnimationData]): Animations in file order.
+    """
+    path: Path
+    tile_w: int
+    tile_h: int
+    hit_box_w: int
+    hit_box_h: int
+    animations: MappingProxyType
+
+    @property
+    def anim_names(self) -> list[str]:
+        """Names of the animations in the sheet, in file order."""
+        return list(self.animations)
+
+    @property
+    def hit_box(self) -> tuple[int, int]:
+        """Hitbox size of the sprite."""
+        return (self.hit_box_w, self.hit_box_h)
+
+    @property
+    def hit_box_offset(self) -> tuple[int, int]:
+        """Difference between the sprite's frame size and hitbox."""
+        return (self.tile_w - self.hit_box_w, self.tile_h - self.hit_box_h)
+
+    @classmethod
+    def from_toml(cls, path: Path, data: dict):
+        """Build a sheet descriptor from the parsed contents of a .toml file."""
+        sheet = data["sheet_data"]
+        animations = {}
+        for key, anim in data.items():
+            if key == "sheet_data":
+                continue
+            animations[key] = AnimationData(
+                name = key,
+                frame_w = sheet["tile_w"],
+                frame_h = sheet["tile_h"],
+                duration = anim["frame_duration"],
+                row = anim["row"],
+                seq = tuple(anim["seq"])
+            )
+        return cls(
+            path = path,
+            tile_w = sheet["tile_w"],
+            tile_h = sheet["tile_h"],
+            hit_box_w = sheet["hit_box_w"],
+            hit_box_h = sheet["hit_box_h"],
+            animations = MappingProxyType(animations)
+        )
+
+class SpriteMetadataCache:
+    """Process-wide cache of parsed sprite sheet metadata.
+
+    Each .toml file is parsed once and stored as a `SpriteSheetData`. An entry
+    is reused for as long as the file's modification time is unchanged.
+
+    Attributes:
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups that had to parse the file.
+    """
+    def __init__(self) -> None:
+        self._entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, sprite_sheet_path: Path) -> SpriteSheetData:
+        """Retrieve the metadata for a sprite sheet, parsing it if needed.
+
+        Args:
+            sprite_sheet_path (Path): Path to the sprite sheet. Any suffix is
+                replaced with .toml.
+
+        Returns:
+            SpriteSheetData: The parsed sheet descriptor.
+        """
+        path = Path(sprite_sheet_path).with_suffix(".toml")
+        mtime = ASSETS.get_mtime(path)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == mtime:
+            self.hits += 1
+            return entry[1]
+        self.misses += 1
+        data = ASSETS.load_toml(path)
+        sheet = SpriteSheetData.from_toml(path, data)
+        self._entries[path] = (mtime, sheet)
+        return sheet
+
+    def invalidate(self, sprite_sheet_path: Path = None):
+        """Drop a cached sheet, or every cached sheet if no path is given."""
+        if sprite_sheet_path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(Path(sprite_sheet_path).with_suffix(".toml"), None)
+
+    def get_stats(self) -> dict:
+        """Retrieve the hit/miss counters and number of cached sheets."""
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "entries" : len(self._entries)
+        }
+
+    def reset_stats(self):
+        """Reset the hit/miss counters."""
+        self.hits = 0
+        self.misses = 0
+
+SPRITE_METADATA = SpriteMetadataCache()
+
+def get_sheet_data(sprite_sheet_path: Path) -> SpriteSheetData:
+    """Retrieve the cached metadata for a sprite sheet."""
+    return SPRITE_METADATA.get(sprite_sheet_path)
 
 def get_anims_in_sprite_sheet(sprite_sheet_path: Path) -> list[str]:
     """Retrieve names of animations in a sprite sheet."""
-    path = sprite_sheet_path.with_suffix(".toml")
-    with open(path, 'r', encoding="utf-8") as file:
-        data = toml.load(file)
-    return [key for key in data if key != "sheet_data"]
+    return get_sheet_data(sprite_sheet_path).anim_names
 
 def get_hit_box_for_sprite(sprite_sheet_path: Path):
     """Retrieve hitbox size in a give sprite sheet."""
-    path = sprite_sheet_path.with_suffix(".toml")
-    with open(path, 'r', encoding="utf-8") as file:
-        data = toml.load(file)
-    return (data["sheet_data"]["hit_box_w"],data["sheet_data"]["hit_box_h"])
+    return get_sheet_data(sprite_sheet_path).hit_box
 
 def get_anim_data(sprite_sheet_path: Path, anim_name):
     """Retrieve data for a specific animation within a sprite sheet.
-    
+
     Args:
         sprite_sheet_name (str): Name of the sprite sheet containing the animation.
         anim_name (str): Name of the animation in the related toml file.
@@ -37,27 +178,37 @@ def get_anim_data(sprite_sheet_path: Path, anim_name):
         - "row" : which row of the sprite sheet the animation is on.
         - "seq" : sequence of columns that create the animation.
     """
-    path = sprite_sheet_path.with_suffix(".toml")
-    with open(path, 'r', encoding="utf-8") as file:
-        data = toml.load(file)
+    anim = get_sheet_data(sprite_sheet_path).animations[anim_name]
     return {
-        "frame_w" : data["sheet_data"]["tile_w"],
-        "frame_h" : data["sheet_data"]["tile_h"],
-        "duration": data[anim_name]["frame_duration"],
-        "row" : data[anim_name]["row"],
-        "seq" : data[anim_name]["seq"]
+        "frame_w" : anim.frame_w,
+        "frame_h" : anim.frame_h,
+        "duration": anim.duration,
+        "row" : anim.row,
+        "seq" : list(anim.seq)
     }
 
 def get_sprite_data(sprite_sheet_path):
     """Retrieve data from a .toml file for a given sprite sheet.
-    
+
     Args:
         sprite_sheet_name (str): Name of the sprite sheet.
 
     Returns:
         dict containing the data in the .toml file.
     """
-    path = sprite_sheet_path.with_suffix(".toml")
-    with open(path, 'r', encoding="utf-8") as file:
-        data = toml.load(file)
+    sheet = get_sheet_data(sprite_sheet_path)
+    data = {
+        "sheet_data" : {
+            "tile_w" : sheet.tile_w,
+            "tile_h" : sheet.tile_h,
+            "hit_box_w" : sheet.hit_box_w,
+            "hit_box_h" : sheet.hit_box_h
+        }
+    }
+    for name, anim in sheet.animations.items():
+        data[name] = {
+            "frame_duration" : anim.duration,
+            "row" : anim.row,
+            "seq" : list(anim.seq)
+        }
     return data
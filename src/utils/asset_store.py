@@ -0,0 +1,274 @@
+"""
+Asset Store module.
+
+This module defines the `AssetStore` class, which serves the game's asset files
+(sprite sheets and their metadata, GUI images, maps, tilesets and game data) from
+a single packed archive. The archive is memory mapped once, and each file is
+handed out as a zero-copy view into it, so loading assets opens one file instead
+of one per asset.
+
+Files missing from the pack, such as baked sprite sheets in the user's cache, are
+read from disk as before. When no pack has been built every file is read from
+disk, so the loose files under `assets/` and `data/` keep working during
+development. A packed file whose loose copy has a different size or modification
+time than when it was packed is read from disk instead, with a warning, so edits
+are picked up before the pack is rebuilt. Rebuild the pack after editing assets
+by running `python -m utils.asset_store` from the src directory.
+
+Pack layout: a fixed prefix (magic, version, index length), a JSON index mapping
+each file's path relative to the game folder to its (offset, size, mtime), and
+the files' contents back to back.
+"""
+
+import io
+import json
+import mmap
+import os
+from pathlib import Path
+import struct
+import threading
+import pygame as pg
+import toml
+from config.directories import GAME_DIR, ASSET_DIR, DATA_DIR, ASSET_PACK
+
+PACK_MAGIC = b"WCPAK"
+PACK_VERSION = 1
+PACK_PREFIX = struct.Struct("<5sBI")
+PACK_SUFFIXES = {".png", ".toml", ".tmx", ".tsx", ".json"}
+
+class AssetStore:
+    """Read-only access to asset files, from the asset pack when there is one.
+
+    Args:
+        pack_path (Path): Path to the asset pack.
+        root (Path): Folder the paths in the pack are relative to.
+
+    Attributes:
+        index (dict): (offset, size, mtime) of every packed file, keyed by its
+            path relative to the root. Empty if there is no pack.
+        pack_reads (int): Number of files served from the pack.
+        file_reads (int): Number of files read from disk.
+        stale (set[str]): Keys of packed files whose loose copy has changed
+            since the pack was built.
+    """
+    def __init__(self, pack_path: Path = ASSET_PACK, root: Path = GAME_DIR) -> None:
+        self.pack_path = Path(pack_path)
+        self.root = Path(root)
+        self.index = None
+        self.buffer = None
+        self.view = None
+        self.pack_reads = 0
+        self.file_reads = 0
+        self.stale = set()
+        # Assets are also loaded on the map prefetch thread
+        self.lock = threading.Lock()
+
+    def open(self):
+        """Map the asset pack into memory, if it hasn't been already."""
+        with self.lock:
+            if self.index is not None:
+                return
+            self.index = {}
+            try:
+                with open(self.pack_path, "rb") as file:
+                    buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                return
+            magic, version, index_len = PACK_PREFIX.unpack_from(buffer)
+            if magic != PACK_MAGIC or version != PACK_VERSION:
+                print(f"Ignoring asset pack {self.pack_path}: unsupported format")
+                return
+            index_end = PACK_PREFIX.size + index_len
+            self.index = json.loads(bytes(buffer[PACK_PREFIX.size:index_end]))
+            self.buffer = buffer
+            self.view = memoryview(buffer)[index_end:]
+
+    def close(self):
+        """Unmap the asset pack. It is mapped again on the next read."""
+        with self.lock:
+            self.index = None
+            self.view = None
+            self.buffer = None
+
+    def get_key(self, path: Path) -> str:
+        """Get a file's key in the pack, or None if it is outside the root."""
+        return get_pack_key(path, self.root)
+
+    def get_entry(self, path: Path) -> tuple[int, int, int]:
+        """Get a file's (offset, size, mtime) in the pack.
+
+        Returns:
+            tuple: The file's entry, or None if it isn't packed or its loose copy
+            has changed since the pack was built.
+        """
+        self.open()
+        key = self.get_key(path)
+        entry = self.index.get(key) if key is not None else None
+        if entry is not None and self.is_stale(key, path, entry):
+            return None
+        return entry
+
+    def is_stale(self, key: str, path: Path, entry: tuple[int, int, int]) -> bool:
+        """Whether the loose copy of a packed file was edited after the pack was built.
+
+        A build shipped without the loose files always reads from the pack.
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if (stat.st_size, stat.st_mtime_ns) == (entry[1], entry[2]):
+            return False
+        if key not in self.stale:
+            self.stale.add(key)
+            print(
+                f"{key} changed since {self.pack_path.name} was built, reading it from disk. "
+                "Rebuild the pack with `python -m utils.asset_store`."
+            )
+        return True
+
+    def exists(self, path: Path) -> bool:
+        """Whether a file is in the pack or on disk."""
+        return self.get_entry(path) is not None or Path(path).exists()
+
+    def get_mtime(self, path: Path) -> int:
+        """Modification time of a file, in nanoseconds, when it was packed or on disk."""
+        return self.get_stat(path)[1]
+
+    def get_stat(self, path: Path) -> tuple[int, int]:
+        """Size and modification time, in nanoseconds, of a file when it was packed or on disk."""
+        entry = self.get_entry(path)
+        if entry is not None:
+            return entry[1], entry[2]
+        stat = Path(path).stat()
+        return stat.st_size, stat.st_mtime_ns
+
+    def get_bytes(self, path: Path):
+        """Get the contents of a file.
+
+        Returns:
+            A read-only memoryview into the pack, or the bytes read from disk if
+            the file isn't packed.
+        """
+        entry = self.get_entry(path)
+        if entry is not None:
+            self.pack_reads += 1
+            offset, size, _ = entry
+            return self.view[offset:offset + size]
+        self.file_reads += 1
+        return Path(path).read_bytes()
+
+    def read_text(self, path: Path) -> str:
+        """Get the contents of a text file."""
+        return str(self.get_bytes(path), encoding="utf-8")
+
+    def load_image(self, path: Path) -> pg.Surface:
+        """Decode an image file, reading it straight from the pack."""
+        path = Path(path)
+        return pg.image.load(MemoryFile(self.get_bytes(path)), path.name)
+
+    def load_toml(self, path: Path) -> dict:
+        """Parse a .toml file."""
+        return toml.loads(self.read_text(path))
+
+    def load_json(self, path: Path):
+        """Parse a .json file."""
+        return json.loads(self.read_text(path))
+
+    def get_stats(self) -> dict:
+        """Retrieve the read counters and number of packed files."""
+        self.open()
+        return {
+            "pack_reads" : self.pack_reads,
+            "file_reads" : self.file_reads,
+            "packed_files" : len(self.index),
+            "stale_files" : len(self.stale)
+        }
+
+ASSETS = AssetStore()
+
+class MemoryFile(io.RawIOBase):
+    """A read-only file over a buffer, such as a view into the asset pack.
+
+    Unlike `io.BytesIO`, the buffer isn't copied up front, each read only copies
+    the bytes asked for.
+    """
+    def __init__(self, buffer) -> None:
+        super().__init__()
+        self.view = memoryview(buffer)
+        self.pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        size = max(0, min(len(buffer), len(self.view) - self.pos))
+        buffer[:size] = self.view[self.pos:self.pos + size]
+        self.pos += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            offset += self.pos
+        elif whence == io.SEEK_END:
+            offset += len(self.view)
+        self.pos = max(0, offset)
+        return self.pos
+
+    def tell(self) -> int:
+        return self.pos
+
+def get_pack_key(path: Path, root: Path) -> str:
+    """Get the key of a file in a pack, its path relative to the root with forward slashes.
+
+    Paths are only normalized, not resolved, so no file system access is needed.
+    Returns None if the file is outside the root.
+    """
+    path = os.path.abspath(path)
+    root = os.path.join(os.path.abspath(root), "")
+    if not path.startswith(root):
+        return None
+    return path[len(root):].replace(os.sep, "/")
+
+def build_pack(
+        pack_path: Path = ASSET_PACK,
+        dirs: tuple[Path] = (ASSET_DIR, DATA_DIR),
+        root: Path = GAME_DIR
+) -> int:
+    """Bundle every asset file under the given folders into a pack.
+
+    Args:
+        pack_path (Path): Where to write the pack.
+        dirs (tuple[Path]): Folders to pack.
+        root (Path): Folder the paths in the pack are relative to.
+
+    Returns:
+        int: The number of files packed.
+    """
+    pack_path = Path(pack_path)
+    files = sorted(
+        path for folder in dirs for path in Path(folder).rglob("*")
+        if path.is_file() and path.suffix.lower() in PACK_SUFFIXES
+    )
+    index = {}
+    offset = 0
+    for path in files:
+        stat = path.stat()
+        index[get_pack_key(path, root)] = (offset, stat.st_size, stat.st_mtime_ns)
+        offset += stat.st_size
+    index_bytes = json.dumps(index).encode()
+    temp_path = pack_path.with_name(pack_path.name + ".tmp")
+    with open(temp_path, "wb") as file:
+        file.write(PACK_PREFIX.pack(PACK_MAGIC, PACK_VERSION, len(index_bytes)))
+        file.write(index_bytes)
+        for path in files:
+            file.write(path.read_bytes())
+    # Replacing the file keeps any existing mapping of the old pack valid
+    temp_path.replace(pack_path)
+    return len(files)
+
+if __name__ == "__main__":
+    print(f"Packed {build_pack()} files into {ASSET_PACK}")
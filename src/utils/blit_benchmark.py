@@ -0,0 +1,106 @@
+"""
+Blit Benchmark module.
+
+This module times the blits of a gameplay scene with its images in the pixel
+format they were decoded in, and again after converting them to the display's
+format, to show what the conversion done by the `SURFACES` cache saves.
+
+The scene is a screen full of tiles cut from the map's tilesets, a number of
+characters drawn from every sprite sheet, and a message box panel. Run it with
+`python -m utils.blit_benchmark [map_name]` from the src directory.
+"""
+
+import sys
+import timeit
+import pygame as pg
+from config.directories import GUI_DIR, MAP_DIR, SPRITES_DIR
+from config.game_settings import SCREEN_WIDTH, SCREEN_HEIGHT, TILESIZE
+from maps.map_data import get_map_files
+from utils.asset_management import get_sheet_data
+from utils.asset_store import ASSETS
+from utils.surface_cache import convert_surface
+
+CHARACTER_COUNT = 20 # Characters drawn per frame
+FRAME_COUNT = 200 # Frames timed per run
+
+def get_tile_blits(map_name: str, screen_size: tuple[int, int]) -> list:
+    """Blits filling the screen with tiles cut from a map's tilesets."""
+    images = [
+        ASSETS.load_image(path)
+        for path in get_map_files(MAP_DIR / f"{map_name}.tmx")
+        if path.suffix == ".png"
+    ]
+    areas = [
+        (image, pg.Rect(x, y, TILESIZE, TILESIZE))
+        for image in images
+        for y in range(0, image.get_height() - TILESIZE + 1, TILESIZE)
+        for x in range(0, image.get_width() - TILESIZE + 1, TILESIZE)
+    ]
+    positions = [
+        (x, y)
+        for y in range(0, screen_size[1], TILESIZE)
+        for x in range(0, screen_size[0], TILESIZE)
+    ]
+    return [(*areas[i % len(areas)], pos) for i, pos in enumerate(positions)] if areas else []
+
+def get_character_blits(screen_size: tuple[int, int]) -> list:
+    """Blits drawing the first frame of every sprite sheet's animations."""
+    frames = []
+    for path in sorted(SPRITES_DIR.rglob("*.png")):
+        image = ASSETS.load_image(path)
+        for anim in get_sheet_data(path).animations.values():
+            area = pg.Rect(anim.seq[0] * anim.frame_w, anim.row * anim.frame_h, anim.frame_w, anim.frame_h)
+            frames.append((image, area))
+    return [
+        (*frames[i % len(frames)], (i * 37 % screen_size[0], i * 53 % screen_size[1]))
+        for i in range(CHARACTER_COUNT)
+    ] if frames else []
+
+def get_gui_blits(screen_size: tuple[int, int]) -> list:
+    """Blit of a message box sized panel."""
+    image = ASSETS.load_image(GUI_DIR / "panel_beigeLight.png")
+    size = (screen_size[0] * 2 // 3, screen_size[1] // 4)
+    image = pg.transform.scale(image, size)
+    return [(image, image.get_rect(), (screen_size[0] // 6, screen_size[1] - size[1]))]
+
+def time_blits(screen: pg.Surface, blits: list) -> float:
+    """Average time, in milliseconds, to do a frame's blits."""
+    sequence = [(image, pos, area) for image, area, pos in blits]
+    seconds = timeit.timeit(lambda: screen.blits(sequence, doreturn=False), number=FRAME_COUNT)
+    return seconds * 1000 / FRAME_COUNT
+
+def convert_blits(blits: list) -> list:
+    """The same blits, with every image converted to the display's format."""
+    converted = {}
+    for image, _, _ in blits:
+        if id(image) not in converted:
+            converted[id(image)] = convert_surface(image)
+    return [(converted[id(image)], area, pos) for image, area, pos in blits]
+
+def run_benchmark(map_name: str = "test") -> dict:
+    """Time the gameplay scene's blits before and after display-format conversion.
+
+    Returns:
+        dict: (before, after) milliseconds per frame, by part of the scene.
+    """
+    screen = pg.display.get_surface()
+    size = screen.get_size()
+    scene = {
+        "tiles" : get_tile_blits(map_name, size),
+        "characters" : get_character_blits(size),
+        "gui" : get_gui_blits(size)
+    }
+    scene["total"] = [blit for blits in scene.values() for blit in blits]
+    return {
+        name : (time_blits(screen, blits), time_blits(screen, convert_blits(blits)))
+        for name, blits in scene.items()
+    }
+
+if __name__ == "__main__":
+    pg.init()
+    pg.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    results = run_benchmark(*sys.argv[1:2])
+    print(f"{'':12}{'file format':>14}{'display format':>16}{'speedup':>10}")
+    for part, (before, after) in results.items():
+        print(f"{part:12}{before:>11.3f} ms{after:>13.3f} ms{before / after:>9.1f}x")
+    pg.quit()
@@ -0,0 +1,97 @@
+"""
+Display module.
+
+This module defines the `DisplayMetrics` class, which keeps the size of the game
+window so it doesn't have to be queried from SDL every time something is drawn.
+The metrics are read once after the window is created and
+again whenever it is resized, and objects laid out against the screen, such as
+the camera and GUI widgets, subscribe to be told about the new size.
+"""
+
+import weakref
+import pygame as pg
+from config.game_settings import SCREEN_WIDTH, SCREEN_HEIGHT, TILESIZE
+
+class DisplayMetrics:
+    """Cached size of the display surface.
+
+    Attributes:
+        size (tuple[int, int]): Width and height of the screen in pixels.
+        tiles (tuple[int, int]): Number of whole tiles that fit on the screen.
+    """
+    def __init__(self, size: tuple[int, int] = (SCREEN_WIDTH, SCREEN_HEIGHT)) -> None:
+        self.size = tuple(size)
+        self.tiles = (self.width // TILESIZE, self.height // TILESIZE)
+        self.subscribers = []
+
+    @property
+    def width(self) -> int:
+        """Width of the screen in pixels."""
+        return self.size[0]
+
+    @property
+    def height(self) -> int:
+        """Height of the screen in pixels."""
+        return self.size[1]
+
+    @property
+    def center(self) -> tuple[float, float]:
+        """Center of the screen."""
+        return (self.width / 2, self.height / 2)
+
+    def update(self) -> bool:
+        """Read the metrics of the current display surface.
+
+        Call after the window is created or resized. Subscribers are notified if
+        the size changed.
+
+        Returns:
+            bool: Whether the size changed.
+        """
+        screen = pg.display.get_surface()
+        if screen is None:
+            return False
+        size = screen.get_size()
+        if size == self.size:
+            return False
+        self.size = size
+        self.tiles = (self.width // TILESIZE, self.height // TILESIZE)
+        self.notify()
+        return True
+
+    def handle_events(self, events) -> bool:
+        """Update the metrics if the window was resized.
+
+        Called by every loop that reads pygame's event queue, so states and
+        sub-states never have to watch for resizes themselves.
+
+        Returns:
+            bool: Whether the size changed.
+        """
+        if any(event.type == pg.VIDEORESIZE for event in events):
+            return self.update()
+        return False
+
+    def subscribe(self, callback):
+        """Call a method with the new screen size whenever the screen is resized.
+
+        Bound methods are held weakly, so subscribers that are garbage collected
+        are dropped from the list without unsubscribing.
+        """
+        if hasattr(callback, "__self__"):
+            self.subscribers.append(weakref.WeakMethod(callback, self.on_collected))
+        else:
+            self.subscribers.append(lambda: callback)
+
+    def on_collected(self, ref):
+        """Drop the reference to a subscriber that was garbage collected."""
+        self.subscribers = [other for other in self.subscribers if other is not ref]
+
+    def notify(self):
+        """Tell every subscriber the current screen size."""
+        for ref in list(self.subscribers):
+            callback = ref()
+            if callback is not None:
+                callback(self.size)
+
+DISPLAY = DisplayMetrics()
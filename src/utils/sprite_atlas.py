@@ -0,0 +1,221 @@
+"""
+Sprite Atlas module.
+
+This module defines the `SpriteAtlas` class, a process-wide store that packs the
+animation frames of every loaded entity into a few large surfaces (pages). Each
+frame is handed out as a subsurface of its page, so drawing many characters
+blits from a handful of source surfaces, and can be done with a single
+`Surface.blits` call, instead of from one sheet or composited copy per frame.
+
+Frames are placed with a skyline packer. Like the `SURFACES` cache, callers pass
+an owner when adding frames, and pages no owner references are dropped by
+`release_unused`.
+"""
+
+import weakref
+import pygame as pg
+from config.cache_settings import SPRITE_ATLAS_PAGE_SIZE
+from utils.surface_cache import convert_surface
+
+class SkylinePacker:
+    """Packs rectangles into a fixed size area, bottom-left first.
+
+    The packer tracks the skyline formed by the top edges of the free area, as
+    (x, y, width) segments from left to right, and places each rectangle where
+    its bottom edge ends up lowest.
+
+    Args:
+        width (int): Width of the area.
+        height (int): Height of the area.
+    """
+    def __init__(self, width: int, height: int) -> None:
+        self.width = width
+        self.height = height
+        self.skyline = [(0, 0, width)]
+        self.used_area = 0
+
+    def get_fit(self, index: int, width: int, height: int) -> int:
+        """Lowest y a rectangle starting at a skyline segment fits at, or None."""
+        x = self.skyline[index][0]
+        if x + width > self.width:
+            return None
+        y = 0
+        remaining = width
+        while remaining > 0:
+            _, seg_y, seg_w = self.skyline[index]
+            y = max(y, seg_y)
+            if y + height > self.height:
+                return None
+            remaining -= seg_w
+            index += 1
+        return y
+
+    def insert(self, width: int, height: int) -> pg.Rect:
+        """Find room for a rectangle and mark it as used.
+
+        Returns:
+            pg.Rect: Where the rectangle was placed, or None if it doesn't fit.
+        """
+        best = None
+        for index, (x, _, _) in enumerate(self.skyline):
+            y = self.get_fit(index, width, height)
+            if y is not None and (best is None or (y + height, x) < best[:2]):
+                best = (y + height, x, index, y)
+        if best is None:
+            return None
+        _, x, index, y = best
+        self.skyline.insert(index, (x, y + height, width))
+        # Cut the segments the new one now covers
+        right = x + width
+        i = index + 1
+        while i < len(self.skyline) and self.skyline[i][0] < right:
+            seg_x, seg_y, seg_w = self.skyline[i]
+            if seg_x + seg_w <= right:
+                del self.skyline[i]
+            else:
+                self.skyline[i] = (right, seg_y, seg_x + seg_w - right)
+                break
+        # Join neighbouring segments at the same height
+        i = 0
+        while i < len(self.skyline) - 1:
+            seg_x, seg_y, seg_w = self.skyline[i]
+            if self.skyline[i + 1][1] == seg_y:
+                self.skyline[i] = (seg_x, seg_y, seg_w + self.skyline[i + 1][2])
+                del self.skyline[i + 1]
+            else:
+                i += 1
+        self.used_area += width * height
+        return pg.Rect(x, y, width, height)
+
+class AtlasPage:
+    """A surface frames are packed into and the owners using it."""
+    def __init__(self, width: int, height: int) -> None:
+        self.surface = convert_surface(pg.Surface((width, height), pg.SRCALPHA))
+        self.surface.fill((0, 0, 0, 0))
+        self.packer = SkylinePacker(width, height)
+        self.keys = []
+        self.owners = weakref.WeakSet()
+
+    def is_used(self) -> bool:
+        """Whether any owner still references the page."""
+        return len(self.owners) > 0
+
+class SpriteAtlas:
+    """Shared pages of packed animation frames.
+
+    Args:
+        page_size (int): Width and height of a page. Frames larger than a page
+            get a page of their own.
+
+    Attributes:
+        pages (list[AtlasPage]): The pages frames are packed into.
+        frames (dict): Frame subsurfaces keyed by what they were created from.
+        hits (int): Number of frames served from the atlas.
+        misses (int): Number of frames that had to be packed.
+    """
+    def __init__(self, page_size: int = SPRITE_ATLAS_PAGE_SIZE) -> None:
+        self.page_size = page_size
+        self.pages = []
+        self.frames = {}
+        self.page_of = {} # key -> AtlasPage
+        self.hits = 0
+        self.misses = 0
+
+    def get_frame(self, key, size: tuple[int, int], owner = None) -> tuple[pg.Surface, bool]:
+        """Retrieve a frame, making room for it if it isn't in the atlas yet.
+
+        Args:
+            key: Identifies the frame, such as its sprite sheets and areas.
+            size (tuple[int, int]): Width and height of the frame.
+            owner (optional): Object that keeps the frame's page in use. Held
+                weakly, like the owners of the surface cache.
+
+        Returns:
+            tuple[pg.Surface, bool]: The frame, a subsurface of its page, and
+            whether it is new. New frames are transparent and must be drawn by
+            the caller before they are used.
+        """
+        frame = self.frames.get(key)
+        is_new = frame is None
+        if is_new:
+            self.misses += 1
+            page, rect = self.allocate(*size)
+            frame = page.surface.subsurface(rect)
+            page.keys.append(key)
+            self.frames[key] = frame
+            self.page_of[key] = page
+        else:
+            self.hits += 1
+        if owner is not None:
+            self.page_of[key].owners.add(owner)
+        return frame, is_new
+
+    def allocate(self, width: int, height: int) -> tuple[AtlasPage, pg.Rect]:
+        """Find room for a frame, starting a new page if none has any."""
+        for page in self.pages:
+            rect = page.packer.insert(width, height)
+            if rect is not None:
+                return page, rect
+        page = AtlasPage(max(width, self.page_size), max(height, self.page_size))
+        self.pages.append(page)
+        return page, page.packer.insert(width, height)
+
+    def acquire(self, frames, owner):
+        """Register an owner with the pages of frames it got earlier."""
+        parents = {frame.get_parent() for frame in frames}
+        for page in self.pages:
+            if page.surface in parents:
+                page.owners.add(owner)
+
+    def release(self, owner):
+        """Remove an owner's references to its pages."""
+        for page in self.pages:
+            page.owners.discard(owner)
+
+    def release_unused(self) -> int:
+        """Drop every page no owner references.
+
+        Frames already handed out stay valid, but aren't reused by later loads.
+
+        Returns:
+            int: The number of pages dropped.
+        """
+        unused = [page for page in self.pages if not page.is_used()]
+        for page in unused:
+            self.pages.remove(page)
+            for key in page.keys:
+                del self.frames[key]
+                del self.page_of[key]
+        return len(unused)
+
+    def get_memory_usage(self) -> int:
+        """Bytes of pixel data held by the pages."""
+        return sum(
+            page.surface.get_width() * page.surface.get_height() * page.surface.get_bytesize()
+            for page in self.pages
+        )
+
+    def get_stats(self) -> dict:
+        """Retrieve the hit/miss counters, number of pages and frames, and how full the pages are."""
+        area = sum(page.packer.width * page.packer.height for page in self.pages)
+        used = sum(page.packer.used_area for page in self.pages)
+        return {
+            "hits" : self.hits,
+            "misses" : self.misses,
+            "pages" : len(self.pages),
+            "frames" : len(self.frames),
+            "fill" : used / area if area else 0
+        }
+
+ATLAS = SpriteAtlas()
+
+def get_blit(image: pg.Surface, pos: tuple[int, int]) -> tuple:
+    """Blit arguments for an image, drawing atlas frames straight from their page.
+
+    The result can be passed to `Surface.blit` or collected for `Surface.blits`,
+    where consecutive blits from the same page are cheapest.
+    """
+    parent = image.get_parent()
+    if parent is None:
+        return (image, pos)
+    return (parent, pos, pg.Rect(image.get_offset(), image.get_size()))
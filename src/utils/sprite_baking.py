@@ -0,0 +1,131 @@
+"""
+Sprite Baking module.
+
+This module composites layered sprite sheets (e.g. a body and the equipment
+drawn over it) into a single sheet and stores the result on disk. Baked sheets
+are named after a hash of the contents of every layer's .png and .toml file,
+so they are reused across runs and rebuilt automatically when any layer changes.
+
+A baked sheet uses the bottom layer's frame layout and is saved next to a copy
+of that layer's .toml file, so it can be loaded like any other sprite sheet.
+"""
+
+import hashlib
+from pathlib import Path
+import pygame as pg
+from config.directories import SPRITE_CACHE_DIR
+from utils.asset_management import get_sheet_data
+from utils.asset_store import ASSETS
+from utils.surface_cache import SURFACES
+
+_digests = {} # (path, mtime) for every layer -> content hash
+
+def get_layers_digest(layers: tuple[Path]) -> str:
+    """Hash the contents of every layer's image and metadata.
+
+    Args:
+        layers (tuple[Path]): The sprite sheets to combine, bottom layer first.
+
+    Returns:
+        str: A hex digest identifying this exact combination of files.
+    """
+    files = []
+    for layer in layers:
+        files += [layer.with_suffix(".png"), layer.with_suffix(".toml")]
+    key = tuple((path, ASSETS.get_mtime(path)) for path in files)
+    if key not in _digests:
+        digest = hashlib.sha1()
+        for path in files:
+            digest.update(ASSETS.get_bytes(path))
+        _digests[key] = digest.hexdigest()
+    return _digests[key]
+
+def get_baked_sheet(layers: tuple[Path]) -> Path:
+    """Retrieve the baked sheet for a combination of layers, baking it if needed.
+
+    Args:
+        layers (tuple[Path]): The sprite sheets to combine, bottom layer first.
+
+    Returns:
+        Path: The baked .png, or None if it could not be baked, in which case
+        frames are composited at runtime instead.
+    """
+    baked_path = find_baked_sheet(layers)
+    if baked_path is not None:
+        return baked_path
+    layers = tuple(Path(layer).with_suffix(".png") for layer in layers)
+    baked_path = SPRITE_CACHE_DIR / f"{get_layers_digest(layers)}.png"
+    try:
+        bake_sheet(layers, baked_path)
+    except (OSError, pg.error, ValueError) as e:
+        print(f"Could not bake sprite sheet {baked_path}: {e}")
+        return None
+    return baked_path
+
+def find_baked_sheet(layers: tuple[Path]) -> Path:
+    """Get the baked sheet for a combination of layers, if it has already been baked.
+
+    Unlike `get_baked_sheet` it never bakes, so it is safe to call off the game thread.
+
+    Returns:
+        Path: The baked .png, or None if it hasn't been baked.
+    """
+    layers = tuple(Path(layer).with_suffix(".png") for layer in layers)
+    baked_path = SPRITE_CACHE_DIR / f"{get_layers_digest(layers)}.png"
+    if baked_path.is_file() and baked_path.with_suffix(".toml").is_file():
+        return baked_path
+    return None
+
+def bake_sheet(layers: tuple[Path], baked_path: Path):
+    """Composite every animation frame of the layers into a single sheet.
+
+    Args:
+        layers (tuple[Path]): The sprite sheets to combine, bottom layer first.
+        baked_path (Path): Where to save the baked .png.
+
+    Raises:
+        ValueError: If the layers' animations are not compatible, or a frame of
+            the bottom layer would need different layers drawn over it in
+            different animations.
+    """
+    base = get_sheet_data(layers[0])
+    sheets = [SURFACES.load(layer) for layer in layers]
+    metadata = [get_sheet_data(layer) for layer in layers]
+    baked = sheets[0].copy()
+    done = {} # Frame position in the bottom layer -> areas of every layer composited there
+    for name, anim in base.animations.items():
+        anims = [data.animations[name] for data in metadata]
+        if not all(len(a.seq) == len(anim.seq) for a in anims):
+            raise ValueError(f"Not all layers have the same number of frames for {name}")
+        if not all((a.frame_w, a.frame_h) == (anim.frame_w, anim.frame_h) for a in anims):
+            raise ValueError(f"Not all layers have the same frame size for {name}")
+        if not all(a.duration == anim.duration for a in anims):
+            raise ValueError(f"Not all layers have the same duration for {name}")
+        for i, col in enumerate(anim.seq):
+            areas = tuple(tuple(get_frame_rect(a, i)) for a in anims)
+            composited = done.get((anim.row, col))
+            if composited is not None:
+                if composited != areas:
+                    raise ValueError(
+                        f"Frame {i} of {name} shares its base frame with another "
+                        "animation but has different layers over it"
+                    )
+                continue
+            done[(anim.row, col)] = areas
+            frame = baked.subsurface(get_frame_rect(anim, i))
+            for sheet, layer_anim in zip(sheets[1:], anims[1:]):
+                frame.blit(sheet, (0, 0), get_frame_rect(layer_anim, i))
+    # Write to a temp file first so a crash never leaves half a sheet behind
+    temp_path = baked_path.with_suffix(".tmp.png")
+    pg.image.save(baked, temp_path)
+    baked_path.with_suffix(".toml").write_bytes(ASSETS.get_bytes(base.path))
+    temp_path.replace(baked_path)
+
+def get_frame_rect(anim, idx: int) -> pg.Rect:
+    """Area of a sprite sheet holding frame `idx` of an animation."""
+    return pg.Rect(
+        anim.seq[idx] * anim.frame_w,
+        anim.row * anim.frame_h,
+        anim.frame_w,
+        anim.frame_h
+    )
@@ -0,0 +1,210 @@
+"""
+Surface Cache module.
+
+This module contains the `SurfaceCache` class, a process-wide store of decoded
+images. Each image file is decoded once and the same pygame Surface is handed
+out to every caller that asks for it.
+
+Callers pass an owner (usually an entity's appearance) when loading a surface.
+The cache tracks which owners reference each surface, and surfaces that no
+owner references are evicted, least recently used first, once the cache grows
+past its memory budget.
+
+Surfaces are converted to the display's pixel format as they are decoded, so
+blitting them never has to convert pixels on the fly. Images decoded before the
+display exists keep their file format until `convert_all` is called.
+
+The cache is shared with the asset loader's worker threads, so every access to
+its entries holds the cache's lock.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+import threading
+import weakref
+import pygame as pg
+from config.cache_settings import SURFACE_CACHE_BUDGET
+from utils.asset_store import ASSETS
+
+class SurfaceCacheEntry:
+    """A decoded surface and the owners currently referencing it."""
+    def __init__(self, surface: pg.Surface) -> None:
+        self.surface = surface
+        self.size = surface.get_width() * surface.get_height() * surface.get_bytesize()
+        self.owners = weakref.WeakSet()
+        self.converted = pg.display.get_surface() is not None
+
+    def is_used(self) -> bool:
+        """Whether any owner still references the surface."""
+        return len(self.owners) > 0
+
+class SurfaceCache:
+    """Shared, reference counted cache of decoded images.
+
+    Attributes:
+        budget (int): Maximum bytes of decoded pixel data to keep once
+            unreferenced surfaces become candidates for eviction.
+        hits (int): Number of loads served from the cache.
+        misses (int): Number of loads that had to decode a file.
+    """
+    def __init__(self, budget: int = SURFACE_CACHE_BUDGET) -> None:
+        self.budget = budget
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.RLock()
+
+    def load(self, path: Path, owner = None) -> pg.Surface:
+        """Retrieve the surface for an image file, decoding it if needed.
+
+        Args:
+            path (Path): Path to the image file.
+            owner (optional): Object that keeps the surface in use. Owners are
+                held weakly, so an owner that is garbage collected releases its
+                surfaces automatically.
+
+        Returns:
+            pg.Surface: The shared surface. Callers must not draw onto it.
+        """
+        path = Path(path)
+        with self.lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(path)
+                if owner is not None:
+                    entry.owners.add(owner)
+                return entry.surface
+            self.misses += 1
+        # Decode without the lock so other threads aren't held up by the file
+        return self.add(path, convert_surface(ASSETS.load_image(path)), owner)
+
+    def add(self, path: Path, surface: pg.Surface, owner = None) -> pg.Surface:
+        """Store a surface decoded elsewhere, such as by the asset loader.
+
+        If the image is already cached the cached surface is kept, so every
+        caller keeps sharing the same one.
+
+        Returns:
+            pg.Surface: The shared surface.
+        """
+        path = Path(path)
+        with self.lock:
+            entry = self._entries.get(path)
+            if entry is None:
+                entry = SurfaceCacheEntry(surface)
+                self._entries[path] = entry
+            if owner is not None:
+                entry.owners.add(owner)
+            return entry.surface
+
+    def convert_all(self) -> int:
+        """Convert the surfaces decoded before the display existed to its format.
+
+        Call once after `pg.display.set_mode`. Surfaces already handed out, and
+        subsurfaces cut from them, keep the format they were loaded in.
+
+        Returns:
+            int: The number of surfaces converted.
+        """
+        if pg.display.get_surface() is None:
+            return 0
+        converted = 0
+        with self.lock:
+            for entry in self._entries.values():
+                if not entry.converted:
+                    entry.surface = convert_surface(entry.surface)
+                    entry.converted = True
+                    converted += 1
+        return converted
+
+    def release(self, owner, path: Path = None):
+        """Remove an owner's reference to one surface, or to all surfaces."""
+        with self.lock:
+            if path is not None:
+                entry = self._entries.get(Path(path))
+                if entry is not None:
+                    entry.owners.discard(owner)
+                return
+            for entry in self._entries.values():
+                entry.owners.discard(owner)
+
+    def get_ref_count(self, path: Path) -> int:
+        """Number of owners currently referencing a surface."""
+        with self.lock:
+            entry = self._entries.get(Path(path))
+            return len(entry.owners) if entry is not None else 0
+
+    def get_memory_usage(self) -> int:
+        """Total bytes of decoded pixel data held by the cache."""
+        with self.lock:
+            return sum(entry.size for entry in self._entries.values())
+
+    def evict(self, budget: int = None) -> int:
+        """Drop unreferenced surfaces until the cache fits in its budget.
+
+        Surfaces are dropped least recently used first. Surfaces that still
+        have owners are never evicted, even if the cache stays over budget.
+
+        Args:
+            budget (int, optional): Overrides the cache's budget for this call.
+
+        Returns:
+            int: The number of surfaces evicted.
+        """
+        if budget is None:
+            budget = self.budget
+        evicted = 0
+        with self.lock:
+            usage = self.get_memory_usage()
+            for path in list(self._entries):
+                if usage <= budget:
+                    break
+                entry = self._entries[path]
+                if not entry.is_used():
+                    usage -= entry.size
+                    del self._entries[path]
+                    evicted += 1
+        return evicted
+
+    def clear(self):
+        """Drop every cached surface."""
+        with self.lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """Retrieve the hit/miss counters and current memory usage."""
+        with self.lock:
+            return {
+                "hits" : self.hits,
+                "misses" : self.misses,
+                "entries" : len(self._entries),
+                "bytes" : self.get_memory_usage()
+            }
+
+SURFACES = SurfaceCache()
+
+def convert_surface(surface: pg.Surface, colorkey = None) -> pg.Surface:
+    """Convert a surface to the display's pixel format, keeping its transparency.
+
+    Surfaces with a colorkey are RLE accelerated, so blitting them skips their
+    transparent pixels. While there is no display the surface keeps its format.
+
+    Args:
+        surface (pg.Surface): The surface to convert.
+        colorkey (optional): Transparent color to set. Defaults to the surface's
+            own colorkey, if it has one.
+
+    Returns:
+        pg.Surface: The converted surface.
+    """
+    if pg.display.get_surface() is not None:
+        if surface.get_flags() & pg.SRCALPHA:
+            surface = surface.convert_alpha()
+        else:
+            surface = surface.convert()
+    if colorkey is None:
+        colorkey = surface.get_colorkey()
+    if colorkey is not None:
+        surface.set_colorkey(colorkey, pg.RLEACCEL)
+    return surface